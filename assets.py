@@ -0,0 +1,108 @@
+"""Static assets served by Streamlit from ``static/`` (``server.enableStaticServing``).
+
+URLs carry a content hash (``app/static/style.css?v=3f2a...``), so a browser
+keeps one cached copy per version and an edited file is picked up on the next
+rerun.  Poppins is bundled under ``static/fonts/`` and loaded by the
+stylesheet after any installed copy, so the page never fetches anything from
+a third-party host.  Streamlit's static route sends ETag and Last-Modified
+but no long Cache-Control; the versioned URLs are safe to mark immutable at a
+proxy.
+
+Photos are resized once into WebP variants under ``static/img/``, named by
+the hash of the source bytes, so identical files share one set of variants.
+The page emits an ``<img srcset>`` and the browser downloads the smallest
+variant that fills its slot.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+from memo import memoize
+
+STATIC_DIR = Path(__file__).with_name("static")
+STATIC_URL = "app/static"
+STYLESHEET = "style.css"
+
+IMAGES = {
+    "profile": "profile.jpg",
+    "happy": "photo_happy.jpg",
+    "tired": "photo_tired.jpg",
+}
+IMAGE_DIR = "img"
+IMAGE_WIDTHS = (160, 320, 640)
+WEBP_QUALITY = 80
+
+
+@memoize(maxsize=64)
+def _content_hash(path: str, mtime_ns: int) -> str:
+    # Keyed by modification time, so the file is hashed once per version
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()[:12]
+
+
+def asset_url(name: str) -> str:
+    path = STATIC_DIR / name
+    return f"{STATIC_URL}/{name}?v={_content_hash(str(path), path.stat().st_mtime_ns)}"
+
+
+def stylesheet_link(name: str = STYLESHEET) -> str:
+    return f'<link rel="stylesheet" href="{asset_url(name)}">'
+
+
+# -----------------------------
+# Images - deduplicated, resized WebP variants
+# -----------------------------
+def _write_variants(source: Path, digest: str) -> None:
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original).convert("RGB")
+    out_dir = STATIC_DIR / IMAGE_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for width in _variant_widths(image.width):
+        target = out_dir / f"{digest}-{width}.webp"
+        if target.exists():
+            continue
+        resized = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        # Written under a temporary name so concurrent sessions never serve a partial file
+        partial = target.with_suffix(f".{os.getpid()}.tmp")
+        resized.save(partial, "WEBP", quality=WEBP_QUALITY, method=6)
+        partial.replace(target)
+
+
+def _variant_widths(width: int) -> list:
+    # Never upscale: the source width itself stands in for the larger sizes
+    return [w for w in IMAGE_WIDTHS if w < width] + ([width] if width <= IMAGE_WIDTHS[-1] else [])
+
+
+@memoize(maxsize=64)
+def _variants(path: str, mtime_ns: int) -> tuple:
+    from PIL import Image
+
+    digest = _content_hash(path, mtime_ns)
+    with Image.open(path) as image:
+        widths = _variant_widths(image.width)
+    if not all((STATIC_DIR / IMAGE_DIR / f"{digest}-{w}.webp").exists() for w in widths):
+        _write_variants(Path(path), digest)
+    return tuple((w, f"{STATIC_URL}/{IMAGE_DIR}/{digest}-{w}.webp") for w in widths)
+
+
+def image_variants(name: str) -> tuple:
+    """``(width, url)`` pairs of the WebP variants of one of ``IMAGES``, generated on first use."""
+    path = Path(__file__).with_name(IMAGES[name])
+    return _variants(str(path), path.stat().st_mtime_ns)
+
+
+def responsive_image(name: str, alt: str, sizes: str, css_class: str = "photo") -> str:
+    """``<img>`` tag whose ``srcset`` lets the browser pick the smallest variant that fills ``sizes``."""
+    variants = image_variants(name)
+    srcset = ", ".join(f"{url} {w}w" for w, url in variants)
+    return (
+        f'<img class="{css_class}" src="{variants[0][1]}" srcset="{srcset}" sizes="{sizes}" '
+        f'alt="{alt}" loading="lazy" decoding="async">'
+    )
+
+
+def build_images() -> list:
+    """Pre-generate the variants of every image, e.g. at deploy time; returns the files written or found."""
+    return sorted({url.rsplit("/", 1)[-1] for name in IMAGES for _, url in image_variants(name)})
@@ -0,0 +1,307 @@
+"""Reproducible benchmarks for the energy-curve pipeline.
+
+Synthetic series from 33 points up to 10M points with 1 to 10k coffee
+events are pushed through each stage the page runs: data generation, the
+metric computations, building the ``go.Figure`` and serializing it to JSON.
+A full headless page run through Streamlit's AppTest, in a fresh interpreter
+so its cold run is comparable between versions, closes the suite.
+The payload suite compares the figure JSON sent to the browser with typed
+arrays against plain JSON lists, for the day view and a year of minute data,
+and times the calendar heatmap aggregation over three years of minute data.
+The style check counts what can hold up first paint: third-party URLs and
+font files the stylesheet refers to, and the bytes sent on every rerun.
+Results are written as JSON; ``--compare`` prints the ratio against an
+earlier results file so regressions show up between versions::
+
+    python bench.py --output bench_results.json
+    python bench.py --quick --compare bench_results.json
+"""
+
+import argparse
+import base64
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly
+import plotly.io as pio
+
+from assets import STATIC_DIR, STYLESHEET, stylesheet_link
+from chart import build_energy_figure, build_history_figure
+from energy_model import DEFAULT_DOSE_MG, energy_curve
+from events import join_energy
+from metrics import EnergyStats
+from pipeline import (
+    calendar_figure,
+    energy_figure,
+    energy_history,
+    energy_pyramid,
+    generate_energy_data,
+    history_calendar,
+)
+from schema import day_frame
+
+POINTS = (33, 1_000, 100_000, 1_000_000, 10_000_000)
+EVENTS = (1, 10, 100, 1_000, 10_000)
+MAX_CELLS = 20_000_000  # points x events evaluated at once by the dense model
+APP = Path(__file__).with_name("coffee.py")
+
+
+def timed(func, repeat: int) -> dict:
+    samples, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - started)
+    return {"seconds": min(samples), "median": statistics.median(samples), "repeat": repeat, "result": result}
+
+
+def synthetic_schedule(points: int, events: int) -> tuple:
+    # Minute samples starting at 6:00, cups spread evenly over the span
+    minutes = 360.0 + np.arange(points, dtype=np.float64) * (960.0 / 32 if points == 33 else 1.0)
+    dose_times = np.linspace(minutes[0], minutes[-1], events + 2)[1:-1]
+    return minutes, dose_times, np.full(events, DEFAULT_DOSE_MG)
+
+
+def generate(minutes, dose_times, doses) -> pd.DataFrame:
+    # The body of generate_energy_data() on arbitrary grids and event counts
+    energy = energy_curve(minutes, dose_times, doses)
+    df = day_frame(np.mod(minutes, 1440), energy, coffee=np.isin(minutes, np.rint(dose_times)))
+    # Multi-day series keep absolute minutes so the x axis stays sorted
+    df["Minute"] = minutes.astype(np.int64)
+    return df
+
+
+def event_table(dose_times, doses) -> pd.DataFrame:
+    return pd.DataFrame(
+        {"Drink": "coffee", "Dose": doses, "Clock": "", "Label": "☕"},
+        index=pd.Index(np.rint(dose_times).astype(np.int64), name="Minute"),
+    )
+
+
+def metrics(df, dose_times) -> EnergyStats:
+    stats = EnergyStats()
+    for t in dose_times:
+        stats.add_coffee(t)
+    return stats.update(df["Minute"].to_numpy(np.float64), df["Energy"])
+
+
+# -----------------------------
+# Suites
+# -----------------------------
+def run_pipeline(points_list, events_list, repeat: int, max_cells: int) -> list:
+    results = []
+    for points in points_list:
+        for events in events_list:
+            case = {"points": points, "events": events}
+            if points * events > max_cells:
+                results.append({**case, "stage": "all", "skipped": f"points x events > {max_cells}"})
+                print(f"{points:>10} pts {events:>6} ev  skipped", file=sys.stderr)
+                continue
+            reps = repeat if points * max(events, 1) <= 1_000_000 else 1
+            minutes, dose_times, doses = synthetic_schedule(points, events)
+
+            gen = timed(lambda: generate(minutes, dose_times, doses), reps)
+            df = gen.pop("result")
+            events_df = join_energy(event_table(dose_times, doses), df["Minute"], df["Energy"])
+
+            met = timed(lambda: metrics(df, dose_times), reps)
+            met.pop("result")
+            fig = timed(lambda: build_energy_figure(df, events_df), reps)
+            figure = fig.pop("result")
+            ser = timed(lambda: pio.to_json(figure, validate=False), reps)
+            payload = ser.pop("result")
+
+            for stage, timing in (("generate", gen), ("metrics", met), ("figure", fig), ("serialize", ser)):
+                results.append({**case, "stage": stage, **timing})
+            results[-1]["bytes"] = len(payload.encode("utf-8"))
+            print(f"{points:>10} pts {events:>6} ev  gen {gen['seconds']:.4f}s  metrics {met['seconds']:.4f}s  "
+                  f"fig {fig['seconds']:.4f}s  json {ser['seconds']:.4f}s ({len(payload) / 1e3:.0f} kB)",
+                  file=sys.stderr)
+    return results
+
+
+def run_default(repeat: int) -> list:
+    # The page's own 33-point day, bypassing the memo cache
+    timing = timed(lambda: generate_energy_data.__wrapped__(), repeat)
+    timing.pop("result")
+    return [{"points": 33, "events": 2, "stage": "generate_energy_data", **timing}]
+
+
+def _as_lists(obj):
+    if isinstance(obj, dict):
+        if "bdata" in obj:
+            return np.frombuffer(base64.b64decode(obj["bdata"]), dtype=obj["dtype"]).tolist()
+        return {k: _as_lists(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_as_lists(v) for v in obj]
+    return obj
+
+
+def _date_strings(trace: dict) -> dict:
+    # Per-trace x arrays of ISO date strings, the encoding used before the numeric time axis
+    if "x0" in trace:
+        ms = trace.pop("x0") + trace.pop("dx") * np.arange(len(trace["y"]))
+    else:
+        ms = np.asarray(trace["x"], dtype=np.float64)
+    y = np.asarray(trace["y"], dtype=np.float64)
+    keep = ~np.isnan(y)  # and no NaN gap padding
+    trace["x"] = np.datetime_as_string(ms[keep].astype("datetime64[ms]"), unit="s").tolist()
+    trace["y"] = y[keep].tolist()
+    return trace
+
+
+def payload_sizes(fig) -> tuple:
+    """Bytes of the figure JSON as date strings and plain lists, and as Streamlit now ships it."""
+    typed = pio.to_json(fig, validate=False)
+    before = _as_lists(json.loads(typed))
+    before["data"] = [_date_strings(trace) for trace in before["data"]]
+    return len(json.dumps(before).encode("utf-8")), len(typed.encode("utf-8"))
+
+
+def run_payload() -> list:
+    year = energy_pyramid(365).tiers["1 min"]
+    figures = {
+        "day_figure": energy_figure(),
+        "year_minutes_figure": build_history_figure(year, "1 min"),
+    }
+    results = []
+    for stage, fig in figures.items():
+        before, after = payload_sizes(fig)
+        points = sum(len(trace.y) for trace in fig.data)
+        results.append({"stage": stage, "points": points, "bytes_before": before, "bytes": after})
+        print(f"{stage:<20} {points:>9} pts  date strings + lists {before / 1e6:.2f} MB  "
+              f"typed arrays {after / 1e6:.2f} MB ({before / after:.1f}x smaller)", file=sys.stderr)
+    return results
+
+
+def run_style() -> list:
+    css = (STATIC_DIR / STYLESHEET).read_text(encoding="utf-8")
+    link = stylesheet_link()
+    external = re.findall(r"https?://[^'\")\s]+", css + link)
+    fetched = set(re.findall(r"url\(['\"]?([^'\")]+)", css))
+    missing = [name for name in fetched if not (STATIC_DIR / name).is_file()]
+    print(f"style                {len(link)} B per rerun, {len(css) / 1e3:.1f} kB stylesheet cached, "
+          f"{len(external)} third-party URLs, {len(fetched)} files fetched by the stylesheet "
+          f"({len(missing)} missing)", file=sys.stderr)
+    return [{"stage": "style", "bytes": len(link), "stylesheet_bytes": len(css), "external_urls": len(external),
+             "stylesheet_fetches": len(fetched), "missing_files": len(missing)}]
+
+
+def run_calendar(years: int = 3) -> list:
+    days = 365 * years
+    samples = len(energy_history(days))
+    start = time.perf_counter()
+    dates, slots, means = history_calendar(days)
+    aggregate = time.perf_counter() - start
+    size = len(pio.to_json(calendar_figure(days), validate=False).encode("utf-8"))
+    print(f"calendar_{years}y          {samples:>9} samples -> {means.shape[0]}x{means.shape[1]} matrix "
+          f"in {aggregate * 1e3:.1f} ms, figure {size / 1e3:.0f} kB", file=sys.stderr)
+    return [{"stage": f"calendar_{years}y", "points": samples, "seconds": aggregate, "bytes": size}]
+
+
+APP_PROBE = """
+import json, statistics, sys, time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file(sys.argv[1], default_timeout=300)
+started = time.perf_counter()
+app.run()
+cold = time.perf_counter() - started
+warm = []
+for _ in range(int(sys.argv[2])):
+    started = time.perf_counter()
+    app.run()
+    warm.append(time.perf_counter() - started)
+print(json.dumps({"cold": cold, "warm": warm, "exception": [str(e.value) for e in app.exception]}))
+"""
+
+
+def run_app(repeat: int) -> list:
+    # A fresh interpreter, so the cold run pays the page's imports, model solves and
+    # caches exactly as a new server process does, whatever the other suites warmed up here
+    with tempfile.TemporaryDirectory() as tmp:
+        # Read when each IntakeStore opens, so the page never touches the real log
+        env = {**os.environ, "COFFEE_DB": str(Path(tmp) / "bench.db")}
+        probe = subprocess.run(
+            [sys.executable, "-c", APP_PROBE, str(APP), str(repeat)],
+            capture_output=True, text=True, check=True, cwd=tmp, env=env,
+        )
+    run = json.loads(probe.stdout.splitlines()[-1])
+    if run["exception"]:
+        raise RuntimeError(f"coffee.py raised: {run['exception']}")
+    cold = {"seconds": run["cold"], "median": run["cold"], "repeat": 1}
+    warm = {"seconds": min(run["warm"]), "median": statistics.median(run["warm"]), "repeat": repeat}
+    print(f"app run  cold {cold['seconds']:.3f}s  warm {warm['seconds']:.3f}s", file=sys.stderr)
+    return [{"stage": "app_run_cold", **cold}, {"stage": "app_run_warm", **warm}]
+
+
+# -----------------------------
+# Output
+# -----------------------------
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=APP.parent
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "plotly": plotly.__version__,
+    }
+
+
+def compare(results: list, baseline_path: str) -> None:
+    def key(r):
+        return r["stage"], r.get("points"), r.get("events")
+
+    baseline = {key(r): r for r in json.loads(Path(baseline_path).read_text())["results"] if "seconds" in r}
+    print(f"{'stage':<22}{'points':>10}{'events':>8}{'before':>11}{'after':>11}{'ratio':>8}")
+    for r in results:
+        old = baseline.get(key(r))
+        if old is None or "seconds" not in r:
+            continue
+        print(f"{r['stage']:<22}{str(r.get('points', '')):>10}{str(r.get('events', '')):>8}"
+              f"{old['seconds']:>11.4f}{r['seconds']:>11.4f}{r['seconds'] / old['seconds']:>8.2f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="bench_results.json", help="results file (default: bench_results.json)")
+    parser.add_argument("--quick", action="store_true", help="only series up to 100k points and 100 events")
+    parser.add_argument("--repeat", type=int, default=5, help="repeats per small case, best is reported (default: 5)")
+    parser.add_argument("--max-cells", type=int, default=MAX_CELLS, help="skip cases with more points x events")
+    parser.add_argument("--no-app", action="store_true", help="skip the headless AppTest page run")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    points = POINTS[:3] if args.quick else POINTS
+    events = EVENTS[:3] if args.quick else EVENTS
+    results = run_default(args.repeat) + run_payload() + run_style() + run_calendar() + run_pipeline(points, events, args.repeat, args.max_cells)
+    if not args.no_app:
+        results += run_app(args.repeat)
+
+    Path(args.output).write_text(json.dumps({"environment": environment(), "results": results}, indent=2))
+    print(f"Wrote {len(results)} results to {args.output}", file=sys.stderr)
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
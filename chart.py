@@ -0,0 +1,464 @@
+import numpy as np
+import plotly.graph_objects as go
+
+from downsample import lttb
+from energy_model import format_clock
+
+# Past this many points the main curve switches to WebGL without text or splines
+LARGE_SERIES_THRESHOLD = 1000
+LARGE_SERIES_MAX_POINTS = 2000
+MS_PER_MINUTE = 60_000
+
+
+# -----------------------------
+# Axes - a date axis reads numbers as milliseconds since the epoch, so times
+# ship as base64 typed arrays instead of one date string per point
+# -----------------------------
+def clock_axis(minutes) -> np.ndarray:
+    # Minute-of-day values on 1970-01-01, so Plotly formats them as clock times
+    return np.rint(np.asarray(minutes, dtype=np.float64) * MS_PER_MINUTE)
+
+
+def time_axis(times) -> np.ndarray:
+    return np.asarray(times).astype("datetime64[ms]").astype(np.float64)
+
+
+def gridded(x, *columns) -> tuple:
+    """Columns spread onto an even grid at the smallest step, gaps as NaN, so ``regular_axis`` applies.
+
+    Kept as is when the grid would be more than twice as long as the data.
+    """
+    step = np.diff(x).min() if len(x) > 1 else 0
+    if step <= 0:
+        return x, columns
+    slots = np.rint((x - x[0]) / step).astype(np.int64)
+    if slots[-1] + 1 > 2 * len(x):
+        return x, columns
+    grid = []
+    for values in columns:
+        full = np.full(slots[-1] + 1, np.nan, dtype=np.float32)
+        full[slots] = values
+        grid.append(full)
+    return x[0] + step * np.arange(slots[-1] + 1), tuple(grid)
+
+
+def regular_axis(x) -> dict:
+    """``x0``/``dx`` in place of an ``x`` array when samples are evenly spaced, shared by every trace on the grid."""
+    steps = np.diff(x)
+    if len(x) > 2 and (steps == steps[0]).all():
+        return dict(x0=float(x[0]), dx=float(steps[0]))
+    return dict(x=x)
+
+
+# -----------------------------
+# Daily Energy Curve figure
+# -----------------------------
+def build_energy_figure(df, events, bands=None, curve=None) -> go.Figure:
+    """Energy samples of ``df`` with ``curve`` = ``(minutes, energy)`` as the line and hover.
+
+    Bands are aligned with ``curve`` when it is given, with ``df`` otherwise.
+    Without a curve the samples are joined by Plotly's client-side spline.
+    """
+    minutes, energy = curve if curve is not None else (df["Minute"].to_numpy(), df["Energy"].to_numpy())
+    large = len(minutes) > LARGE_SERIES_THRESHOLD
+    if large:
+        # Downsample once and reuse the kept points for the bands so they stay aligned
+        keep = lttb(minutes, energy, LARGE_SERIES_MAX_POINTS)
+        minutes, energy = minutes[keep], energy[keep]
+        if bands is not None:
+            bands = np.asarray(bands)[:, keep]
+    scatter = go.Scattergl if large else go.Scatter
+    shape = 'spline' if curve is None and not large else 'linear'
+    x = regular_axis(clock_axis(minutes))
+
+    fig = go.Figure()
+
+    # Population p10-p90 band and median
+    if bands is not None:
+        p10, p50, p90 = bands
+        fig.add_trace(go.Scatter(
+            **x,
+            y=np.asarray(p90, dtype=np.float32),
+            mode="lines",
+            line=dict(width=0, shape=shape),
+            hoverinfo="skip",
+            name="Population p90"
+        ))
+        fig.add_trace(go.Scatter(
+            **x,
+            y=np.asarray(p10, dtype=np.float32),
+            mode="lines",
+            line=dict(width=0, shape=shape),
+            fill="tonexty",
+            fillcolor='rgba(212, 165, 116, 0.15)',
+            hoverinfo="skip",
+            name="Population p10"
+        ))
+        fig.add_trace(scatter(
+            **x,
+            y=np.asarray(p50, dtype=np.float32),
+            mode="lines",
+            line=dict(width=2, color='rgba(244, 228, 193, 0.6)', dash='dot', shape=shape),
+            name="Population median",
+            hovertemplate="Median: %{y:.0f}%<extra></extra>"
+        ))
+
+    # Main energy curve
+    fig.add_trace(scatter(
+        **x,
+        y=np.asarray(energy, dtype=np.float32),
+        mode="lines",
+        line=dict(width=2 if large else 4, color='#d4a574', shape=shape),
+        name="Energy Level",
+        hovertemplate="Energy: %{y:.0f}%<extra></extra>"
+    ))
+
+    # Sample markers with the coffee cups; the line above carries the hover
+    if len(df) <= LARGE_SERIES_THRESHOLD:
+        fig.add_trace(go.Scatter(
+            **regular_axis(clock_axis(df["Minute"])),
+            y=df["Energy"].to_numpy(),
+            mode="markers+text",
+            marker=dict(size=10, color='#8b4513', line=dict(width=2, color='#f4e4c1')),
+            text=np.where(df["Coffee"].to_numpy(dtype=bool), "☕", ""),
+            textposition="top center",
+            textfont=dict(size=14),
+            hoverinfo="skip",
+            name="Samples"
+        ))
+
+    # Highlight coffee moments, placed by the interpolated event join
+    fig.add_trace(go.Scatter(
+        x=clock_axis(events.index),
+        y=events["Energy"],
+        mode="markers+text",
+        marker=dict(size=24, symbol="star", color='#FFD700', line=dict(width=3, color='#8b4513')),
+        text=events["Label"],
+        customdata=events["Clock"],
+        textposition="bottom center",
+        textfont=dict(size=13, color='#FFD700', family='Poppins'),
+        name="Coffee Moments",
+        hovertemplate="<b>%{text}</b><br>Time: %{customdata}<br>Energy: %{y:.0f}%<extra></extra>"
+    ))
+
+    fig.update_layout(
+        template="plotly_dark",
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0.3)',
+        yaxis=dict(
+            range=[0, 100],
+            title="Energy Level (%)",
+            gridcolor='rgba(212, 165, 116, 0.1)',
+            tickfont=dict(color='#f4e4c1', size=12)
+        ),
+        xaxis=dict(
+            title="Time of Day",
+            type="date",
+            tickformat="%-H:%M",
+            hoverformat="%-H:%M",
+            dtick=None if large else 30 * MS_PER_MINUTE,
+            gridcolor='rgba(212, 165, 116, 0.1)',
+            tickfont=dict(color='#f4e4c1', size=11),
+            tickangle=-45
+        ),
+        height=550,
+        hovermode="x unified",
+        margin=dict(l=20, r=20, t=20, b=80),
+        font=dict(color='#f4e4c1', family='Poppins'),
+        showlegend=False
+    )
+    return fig
+
+
+# -----------------------------
+# Energy history figure - one pyramid tier
+# -----------------------------
+def build_history_figure(rows, tier: str) -> go.Figure:
+    # Nights and missing days become NaN gaps, and the three traces share x0/dx instead of an x array each
+    x, (high, low, mean) = gridded(time_axis(rows["Time"]), rows["Max"], rows["Min"], rows["Mean"])
+    x = regular_axis(x)
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        **x,
+        y=np.asarray(high, dtype=np.float32),
+        mode="lines",
+        line=dict(width=0),
+        hoverinfo="skip",
+        name="Max"
+    ))
+    fig.add_trace(go.Scatter(
+        **x,
+        y=np.asarray(low, dtype=np.float32),
+        mode="lines",
+        line=dict(width=0),
+        fill="tonexty",
+        fillcolor='rgba(212, 165, 116, 0.2)',
+        hoverinfo="skip",
+        name="Min"
+    ))
+    fig.add_trace(go.Scatter(
+        **x,
+        y=np.asarray(mean, dtype=np.float32),
+        mode="lines",
+        line=dict(width=2, color='#d4a574'),
+        name=f"Mean ({tier})",
+        hovertemplate="<b>%{x|%Y-%m-%d %H:%M}</b><br>Mean energy: %{y:.0f}%<extra></extra>"
+    ))
+
+    fig.update_layout(
+        template="plotly_dark",
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0.3)',
+        yaxis=dict(
+            range=[0, 100],
+            title="Energy Level (%)",
+            gridcolor='rgba(212, 165, 116, 0.1)',
+            tickfont=dict(color='#f4e4c1', size=12)
+        ),
+        xaxis=dict(
+            title=f"Date ({tier} min / mean / max)",
+            type="date",
+            gridcolor='rgba(212, 165, 116, 0.1)',
+            tickfont=dict(color='#f4e4c1', size=11)
+        ),
+        height=400,
+        hovermode="x unified",
+        margin=dict(l=20, r=20, t=20, b=60),
+        font=dict(color='#f4e4c1', family='Poppins'),
+        showlegend=False
+    )
+    return fig
+
+
+# -----------------------------
+# Energy calendar - one heatmap matrix and one NaN-separated small-multiples trace
+# -----------------------------
+MS_PER_DAY = 86_400_000
+PANEL_TICK_MINUTES = 240
+HEATMAP_COLORSCALE = [[0.0, '#1a0f08'], [0.4, '#5c2e0e'], [0.7, '#b8733a'], [1.0, '#f4e4c1']]
+
+
+def build_heatmap_figure(dates, slot_starts, means) -> go.Figure:
+    """Day x time-of-day heatmap; both axes are regular grids sent as ``x0/dx`` and ``y0/dy``."""
+    step = float(slot_starts[1] - slot_starts[0]) if len(slot_starts) > 1 else 1.0
+    fig = go.Figure(go.Heatmap(
+        z=np.asarray(means, dtype=np.float32),
+        x0=float(clock_axis(slot_starts[0] + step / 2)),
+        dx=step * MS_PER_MINUTE,
+        y0=float(time_axis(dates[:1])[0]),
+        dy=MS_PER_DAY,
+        zmin=0,
+        zmax=100,
+        colorscale=HEATMAP_COLORSCALE,
+        colorbar=dict(title="Energy %", tickfont=dict(color='#f4e4c1')),
+        hovertemplate="<b>%{y|%Y-%m-%d}</b> %{x|%-H:%M}<br>Mean energy: %{z:.0f}%<extra></extra>"
+    ))
+    fig.update_layout(
+        template="plotly_dark",
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0.3)',
+        xaxis=dict(
+            title="Time of Day",
+            type="date",
+            tickformat="%-H:%M",
+            tickfont=dict(color='#f4e4c1', size=11)
+        ),
+        yaxis=dict(
+            title="Day",
+            type="date",
+            autorange="reversed",
+            tickfont=dict(color='#f4e4c1', size=11)
+        ),
+        height=550,
+        margin=dict(l=20, r=20, t=20, b=60),
+        font=dict(color='#f4e4c1', family='Poppins')
+    )
+    return fig
+
+
+def build_small_multiples_figure(x, y, offsets, span: tuple, labels) -> go.Figure:
+    """Panels from ``daymatrix.day_panels`` as one line trace, labelled with ``labels`` in date order."""
+    lo, hi = span
+    ticks = np.arange(-(-lo // PANEL_TICK_MINUTES) * PANEL_TICK_MINUTES, hi + 1, PANEL_TICK_MINUTES)
+    tickvals = (np.asarray(offsets)[:, None] + ticks).ravel()
+    fig = go.Figure(go.Scatter(
+        x=np.asarray(x, dtype=np.float32),
+        y=np.asarray(y, dtype=np.float32),
+        mode="lines",
+        line=dict(width=2, color='#d4a574'),
+        connectgaps=False,
+        name="Energy Level",
+        hovertemplate="Energy: %{y:.0f}%<extra></extra>"
+    ))
+    for offset, label in zip(offsets, labels):
+        fig.add_annotation(x=offset + (lo + hi) / 2, y=100, text=label, showarrow=False, yanchor="bottom",
+                           font=dict(color='#FFD700', size=12))
+    fig.update_layout(
+        template="plotly_dark",
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0.3)',
+        yaxis=dict(
+            range=[0, 108],
+            title="Energy Level (%)",
+            gridcolor='rgba(212, 165, 116, 0.1)',
+            tickfont=dict(color='#f4e4c1', size=12)
+        ),
+        xaxis=dict(
+            tickvals=tickvals,
+            ticktext=[format_clock(m) for m in np.tile(ticks, len(offsets))],
+            gridcolor='rgba(212, 165, 116, 0.1)',
+            tickfont=dict(color='#f4e4c1', size=10),
+            zeroline=False
+        ),
+        height=300,
+        margin=dict(l=20, r=20, t=30, b=40),
+        font=dict(color='#f4e4c1', family='Poppins'),
+        showlegend=False
+    )
+    return fig
+
+
+# -----------------------------
+# Scenario comparison - every curve on one shared x0/dx axis
+# -----------------------------
+SCENARIO_COLORS = ('#f4e4c1', '#d4a574', '#8b4513', '#7fb3a6', '#c97b63')
+
+
+def scenario_trace(name: str, minutes, energy, index: int = 0) -> go.Scatter:
+    """One scenario's line; evenly sampled ``minutes`` become the shared ``x0``/``dx`` axis."""
+    return go.Scatter(
+        **regular_axis(clock_axis(minutes)),
+        y=np.asarray(energy, dtype=np.float32),
+        mode="lines",
+        line=dict(width=3, color=SCENARIO_COLORS[index % len(SCENARIO_COLORS)]),
+        name=name,
+        hovertemplate=f"{name}: %{{y:.0f}}%<extra></extra>"
+    )
+
+
+def build_scenario_figure(traces, threshold: float) -> go.Figure:
+    """The ``scenario_trace`` lines on one chart with the threshold marked."""
+    fig = go.Figure(list(traces))
+    fig.add_hline(y=threshold, line=dict(width=1, dash="dash", color='rgba(244, 228, 193, 0.4)'))
+    fig.update_layout(
+        template="plotly_dark",
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0.3)',
+        yaxis=dict(
+            range=[0, 100],
+            title="Energy Level (%)",
+            gridcolor='rgba(212, 165, 116, 0.1)',
+            tickfont=dict(color='#f4e4c1', size=12)
+        ),
+        xaxis=dict(
+            title="Time of Day",
+            type="date",
+            tickformat="%-H:%M",
+            hoverformat="%-H:%M",
+            gridcolor='rgba(212, 165, 116, 0.1)',
+            tickfont=dict(color='#f4e4c1', size=11)
+        ),
+        height=450,
+        hovermode="x unified",
+        margin=dict(l=20, r=20, t=20, b=60),
+        font=dict(color='#f4e4c1', family='Poppins'),
+        legend=dict(orientation="h", y=1.08, x=0)
+    )
+    return fig
+
+
+# -----------------------------
+# What-if figure - fixed grid, traces updated in place on every change
+# -----------------------------
+def build_whatif_figure(minutes) -> go.Figure:
+    """Energy line on the fixed ``minutes`` grid and the cup stars, filled in place by ``update_whatif_figure``."""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        **regular_axis(clock_axis(minutes)),
+        y=np.zeros(len(minutes), dtype=np.float32),
+        mode="lines",
+        line=dict(width=4, color='#d4a574'),
+        name="Energy Level",
+        hovertemplate="Energy: %{y:.0f}%<extra></extra>"
+    ))
+    fig.add_trace(go.Scatter(
+        x=[],
+        y=[],
+        mode="markers+text",
+        marker=dict(size=24, symbol="star", color='#FFD700', line=dict(width=3, color='#8b4513')),
+        textposition="bottom center",
+        textfont=dict(size=13, color='#FFD700', family='Poppins'),
+        name="Coffee Moments",
+        hovertemplate="<b>%{text}</b><br>Energy: %{y:.0f}%<extra></extra>"
+    ))
+    fig.update_layout(
+        template="plotly_dark",
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0.3)',
+        yaxis=dict(
+            range=[0, 100],
+            title="Energy Level (%)",
+            gridcolor='rgba(212, 165, 116, 0.1)',
+            tickfont=dict(color='#f4e4c1', size=12)
+        ),
+        xaxis=dict(
+            title="Time of Day",
+            type="date",
+            tickformat="%-H:%M",
+            hoverformat="%-H:%M",
+            gridcolor='rgba(212, 165, 116, 0.1)',
+            tickfont=dict(color='#f4e4c1', size=11)
+        ),
+        height=400,
+        hovermode="x unified",
+        margin=dict(l=20, r=20, t=20, b=60),
+        font=dict(color='#f4e4c1', family='Poppins'),
+        showlegend=False,
+        uirevision="whatif"
+    )
+    return fig
+
+
+def update_whatif_figure(fig: go.Figure, energy, star_minutes, star_energy, labels) -> None:
+    # The grid never changes, so only the y values and the stars are replaced
+    fig.data[0].y = np.asarray(energy, dtype=np.float32)
+    fig.data[1].update(x=clock_axis(star_minutes), y=np.asarray(star_energy, dtype=np.float32), text=labels)
+
+
+# -----------------------------
+# Live stream figure - traces are updated in place on every tick
+# -----------------------------
+def build_live_figure() -> go.Figure:
+    fig = go.Figure(go.Scattergl(
+        x=[],
+        y=[],
+        mode="lines",
+        line=dict(width=2, color='#d4a574'),
+        name="Live Energy",
+        hovertemplate="Energy: %{y:.0f}%<extra></extra>"
+    ))
+    fig.update_layout(
+        template="plotly_dark",
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0.3)',
+        yaxis=dict(
+            range=[0, 100],
+            title="Energy Level (%)",
+            gridcolor='rgba(212, 165, 116, 0.1)',
+            tickfont=dict(color='#f4e4c1', size=12)
+        ),
+        xaxis=dict(
+            title="Time",
+            type="date",
+            hoverformat="%-H:%M:%S",
+            gridcolor='rgba(212, 165, 116, 0.1)',
+            tickfont=dict(color='#f4e4c1', size=11)
+        ),
+        height=350,
+        hovermode="x unified",
+        margin=dict(l=20, r=20, t=20, b=60),
+        font=dict(color='#f4e4c1', family='Poppins'),
+        showlegend=False,
+        uirevision="live"
+    )
+    return fig
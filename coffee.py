@@ -1,6 +1,15 @@
+import os
+
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
+
+# pandas, plotly figures and the pipeline are imported further down, after the
+# precomputed default view has been drawn
+from assets import responsive_image, stylesheet_link
+from intake_store import DEFAULT_USER, IntakeStore
+from memo import cache_stats
+from profiling import Profiler
+from startup import default_view
+from streaming import LiveFeed
 
 # -----------------------------
 # Page Config
@@ -11,176 +20,23 @@ st.set_page_config(
     layout="wide"
 )
 
+# Opt-in section profiling, for the operator only: COFFEE_PROFILE=1
+profiler = Profiler(os.environ.get("COFFEE_PROFILE") == "1")
+
 # -----------------------------
 # 🎨 Enhanced Professional Style
 # -----------------------------
-st.markdown(
-    """
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;600;700;900&display=swap');
-    
-    * {
-        font-family: 'Poppins', sans-serif;
-    }
-    
-    .main {
-        background: linear-gradient(135deg, #1a0d08 0%, #2d1810 25%, #1f1410 50%, #0f0a08 100%);
-        color: #f9fafb;
-    }
-    
-    .block-container {
-        padding-top: 2.5rem;
-        padding-bottom: 2rem;
-        max-width: 1200px;
-    }
-    
-    .hero-section {
-        text-align: center;
-        padding: 2rem 1rem 1.5rem 1rem;
-        background: linear-gradient(135deg, rgba(139, 69, 19, 0.15) 0%, rgba(101, 67, 33, 0.1) 100%);
-        border-radius: 24px;
-        margin-bottom: 2rem;
-        border: 1px solid rgba(184, 134, 11, 0.2);
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.4);
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .hero-section::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        height: 3px;
-        background: linear-gradient(90deg, #d4a574, #8b4513, #d4a574);
-        animation: shimmer 3s infinite;
-    }
-    
-    @keyframes shimmer {
-        0%, 100% { opacity: 0.5; }
-        50% { opacity: 1; }
-    }
-    
-    .big-title {
-        font-size: 3.5rem;
-        font-weight: 900;
-        letter-spacing: 0.15em;
-        text-transform: uppercase;
-        margin-bottom: 0.5rem;
-        background: linear-gradient(135deg, #f4e4c1 0%, #d4a574 50%, #8b4513 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        text-shadow: 0 4px 12px rgba(139, 69, 19, 0.3);
-    }
-    
-    .subtitle {
-        font-size: 1.15rem;
-        color: #e5e7eb;
-        margin-bottom: 1rem;
-        font-weight: 300;
-        line-height: 1.6;
-    }
-    
-    .coffee-icon {
-        font-size: 4rem;
-        margin-bottom: 0.5rem;
-        filter: drop-shadow(0 4px 8px rgba(139, 69, 19, 0.6));
-    }
-    
-    .card {
-        background: linear-gradient(135deg, rgba(30, 20, 15, 0.95) 0%, rgba(20, 15, 12, 0.98) 100%);
-        border-radius: 20px;
-        padding: 1.8rem 2rem;
-        border: 1px solid rgba(212, 165, 116, 0.25);
-        box-shadow: 0 10px 40px rgba(0, 0, 0, 0.6);
-        margin-bottom: 1.5rem;
-        transition: transform 0.3s ease, box-shadow 0.3s ease;
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .card::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        height: 2px;
-        background: linear-gradient(90deg, transparent, #d4a574, transparent);
-    }
-    
-    .card:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 15px 50px rgba(139, 69, 19, 0.4);
-    }
-    
-    .section-title {
-        font-size: 1.5rem;
-        font-weight: 700;
-        margin-bottom: 1rem;
-        display: flex;
-        align-items: center;
-        gap: 0.6rem;
-        color: #d4a574;
-        border-bottom: 2px solid rgba(212, 165, 116, 0.2);
-        padding-bottom: 0.5rem;
-    }
-    
-    .metric-container {
-        background: linear-gradient(135deg, rgba(139, 69, 19, 0.15) 0%, rgba(101, 67, 33, 0.1) 100%);
-        border-radius: 16px;
-        padding: 1.2rem;
-        border: 1px solid rgba(212, 165, 116, 0.2);
-        text-align: center;
-        transition: all 0.3s ease;
-    }
-    
-    .metric-container:hover {
-        transform: scale(1.05);
-        border-color: rgba(212, 165, 116, 0.5);
-    }
-    
-    .footer-note {
-        text-align: center;
-        opacity: 0.7;
-        margin-top: 1rem;
-        font-size: 0.95rem;
-        font-style: italic;
-        color: #d4a574;
-    }
-    
-    .author-section {
-        text-align: center;
-        padding: 1.5rem;
-        margin-top: 2rem;
-        background: linear-gradient(135deg, rgba(139, 69, 19, 0.1) 0%, rgba(101, 67, 33, 0.05) 100%);
-        border-radius: 20px;
-        border: 1px solid rgba(212, 165, 116, 0.15);
-    }
-    
-    .author-name {
-        font-size: 1.1rem;
-        font-weight: 600;
-        color: #d4a574;
-        margin: 0;
-    }
-    
-    .author-label {
-        font-size: 0.85rem;
-        color: #e5e7eb;
-        opacity: 0.7;
-        margin-top: 0.2rem;
-    }
-    </style>
-    """,
-    unsafe_allow_html=True
-)
+profiler.mark("style")
+# static/style.css is served by Streamlit (server.enableStaticServing) and cached by
+# the browser; only this one-line <link> is sent on each rerun
+style = stylesheet_link()
+st.markdown(style, unsafe_allow_html=True)
+profiler.payload_text(style)
 
 # -----------------------------
 # HEADER WITH HERO SECTION
 # -----------------------------
+profiler.mark("hero")
 st.markdown(
     """
     <div class='hero-section'>
@@ -193,134 +49,90 @@ st.markdown(
 )
 
 # -----------------------------
-# Data Generator - Fixed 2 coffees at 7:30 and 14:00
+# Data Generator - today's cups come from the intake event store
 # -----------------------------
-def generate_energy_data() -> pd.DataFrame:
-    hours = ["6:00", "6:30", "7:00", "7:30", "8:00", "8:30", "9:00", "9:30", "10:00", "10:30",
-             "11:00", "11:30", "12:00", "12:30", "13:00", "13:30", "14:00", "14:30", "15:00", 
-             "15:30", "16:00", "16:30", "17:00", "17:30", "18:00", "18:30", "19:00", "19:30", 
-             "20:00", "20:30", "21:00", "21:30", "22:00"]
-
-    # Realistic energy curve with 2 coffees - second coffee less effective
-    energy = [
-        12,  # 6:00 - Just waking up
-        15,  # 6:30 - Getting up
-        20,  # 7:00 - Morning routine
-        25,  # 7:30 - ☕ FIRST COFFEE
-        45,  # 8:00 - Coffee kicking in
-        70,  # 8:30 - Rising energy
-        85,  # 9:00 - Peak productivity
-        82,  # 9:30 - Sustained high
-        78,  # 10:00 - Still good
-        72,  # 10:30 - Gradual decline
-        68,  # 11:00 - Mid-morning
-        65,  # 11:30 - Pre-lunch
-        60,  # 12:00 - Lunch time
-        55,  # 12:30 - Post-lunch dip starting
-        48,  # 13:00 - Afternoon slump
-        42,  # 13:30 - Energy low
-        38,  # 14:00 - ☕ SECOND COFFEE
-        50,  # 14:30 - Coffee effect starting (less boost)
-        62,  # 15:00 - Energy rising (lower than morning)
-        68,  # 15:30 - Second peak (significantly lower)
-        70,  # 16:00 - Afternoon peak (max 70% vs 85%)
-        67,  # 16:30 - Slight decline
-        63,  # 17:00 - Gradual decline
-        58,  # 17:30 - Energy dropping
-        52,  # 18:00 - End of workday
-        45,  # 18:30 - Evening transition
-        38,  # 19:00 - Relaxing
-        32,  # 19:30 - Winding down
-        28,  # 20:00 - Evening
-        24,  # 20:30 - Getting tired
-        20,  # 21:00 - Preparing for bed
-        17,  # 21:30 - Very tired
-        15   # 22:00 - Ready to sleep
-    ]
-
-    # Minimal markers - professional presentation
-    mood = [""] * len(energy)
-    
-    # Only mark coffee moments
-    mood[3] = "☕"   # 7:30 - First coffee
-    mood[16] = "☕"  # 14:00 - Second coffee
-
-    return pd.DataFrame({
-        "Hour": hours,
-        "Energy": energy,
-        "Mood": mood
-    })
+profiler.mark("data")
+# The standard day is served from the build-time artifact (python startup.py)
+view = default_view(DEFAULT_USER)
+if view is not None:
+    schedule, population, metrics, fig = view["schedule"], view["population"], view["metrics"], view["figure"]
+else:
+    from pipeline import (
+        CURVE_RESOLUTION,
+        POPULATION_SIZE as population,
+        daily_params,
+        energy_figure,
+        energy_metrics,
+        logged_schedule,
+    )
 
-df = generate_energy_data()
+    schedule = logged_schedule()
+    params = daily_params()
+    metrics = energy_metrics(schedule, params=params)
+    fig = energy_figure(schedule, population, CURVE_RESOLUTION, params)
 
-# Coffee moments
-coffee_hours = ["7:30", "14:00"]
+# Drinks logged in the same minute share one schedule entry, so cups are counted from the log
+cups = IntakeStore().day_count(DEFAULT_USER) or metrics['cups']
 
 # -----------------------------
 # PLOTLY CURVE
 # -----------------------------
+profiler.mark("curve")
 st.markdown("<div class='card'>", unsafe_allow_html=True)
 st.markdown("<div class='section-title'>📈 Daily Energy Curve</div>", unsafe_allow_html=True)
 
-fig = go.Figure()
-
-# Main energy curve
-fig.add_trace(go.Scatter(
-    x=df["Hour"],
-    y=df["Energy"],
-    mode="lines+markers+text",
-    line=dict(width=4, color='#d4a574', shape='spline'),
-    marker=dict(size=10, color='#8b4513', line=dict(width=2, color='#f4e4c1')),
-    text=df["Mood"],
-    textposition="top center",
-    textfont=dict(size=14),
-    name="Energy Level",
-    hovertemplate="<b>%{x}</b><br>Energy: %{y}%<extra></extra>"
-))
-
-# Highlight coffee moments
-coffee_y = [df.loc[df["Hour"] == h, "Energy"].values[0] for h in coffee_hours]
-fig.add_trace(go.Scatter(
-    x=coffee_hours,
-    y=coffee_y,
-    mode="markers+text",
-    marker=dict(size=24, symbol="star", color='#FFD700', line=dict(width=3, color='#8b4513')),
-    text=["☕ Morning", "☕ Afternoon"],
-    textposition="bottom center",
-    textfont=dict(size=13, color='#FFD700', family='Poppins'),
-    name="Coffee Moments",
-    hovertemplate="<b>%{text}</b><br>Time: %{x}<br>Energy: %{y}%<extra></extra>"
-))
-
-fig.update_layout(
-    template="plotly_dark",
-    paper_bgcolor='rgba(0,0,0,0)',
-    plot_bgcolor='rgba(0,0,0,0.3)',
-    yaxis=dict(
-        range=[0, 100],
-        title="Energy Level (%)",
-        gridcolor='rgba(212, 165, 116, 0.1)',
-        tickfont=dict(color='#f4e4c1', size=12)
-    ),
-    xaxis=dict(
-        title="Time of Day",
-        gridcolor='rgba(212, 165, 116, 0.1)',
-        tickfont=dict(color='#f4e4c1', size=11),
-        tickangle=-45
-    ),
-    height=550,
-    hovermode="x unified",
-    margin=dict(l=20, r=20, t=20, b=80),
-    font=dict(color='#f4e4c1', family='Poppins'),
-    showlegend=False
-)
-
 st.plotly_chart(fig, use_container_width=True)
+profiler.payload_figure(fig)
+st.caption(f"Shaded band: p10-p90 energy of {population:,} simulated people on the same schedule, dotted line: median.")
 st.markdown("</div>", unsafe_allow_html=True)
 
+# -----------------------------
+# LIVE STREAM - only this fragment reruns on every refresh
+# -----------------------------
+STREAM_SOURCE = os.environ.get("COFFEE_STREAM")  # JSONL/CSV file to tail, or udp://host:port
+REFRESH_SECONDS = 3
+
+
+@st.cache_resource
+def live_feed(spec: str) -> LiveFeed:
+    # One feed per server process, shared by every session
+    return LiveFeed(spec)
+
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def live_energy():
+    from chart import build_live_figure, time_axis
+
+    times, energy, added = live_feed(STREAM_SOURCE).refresh()
+    if "live_fig" not in st.session_state:
+        st.session_state.live_fig = build_live_figure()
+    live_fig = st.session_state.live_fig
+    # The buffer is bounded, so replacing the trace arrays costs the same at every tick
+    live_fig.data[0].update(x=time_axis(times), y=energy)
+
+    st.plotly_chart(live_fig, use_container_width=True, key="live_chart")
+    # Running aggregates cover the whole stream, updated only with the new samples
+    feed = live_feed(STREAM_SOURCE)
+    stats = feed.stats
+    skipped = f", {feed.rejected} malformed skipped" if feed.rejected else ""
+    live1, live2, live3, live4 = st.columns(4)
+    live1.metric("📡 Latest", f"{energy[-1]:.0f}%" if len(energy) else "-", f"+{added} samples{skipped}")
+    live2.metric("🔝 Peak", f"{stats.peak:.0f}%" if stats.count else "-")
+    live3.metric("⚡ Average", f"{stats.mean:.1f}%" if stats.count else "-", f"σ {stats.std:.1f}")
+    live4.metric("🎯 In Zone", f"{stats.minutes_above / 60:.1f} h", f"≥ {stats.threshold:.0f}%")
+
+
+if STREAM_SOURCE:
+    profiler.mark("live")
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("<div class='section-title'>📡 Live Energy</div>", unsafe_allow_html=True)
+    live_energy()
+    st.markdown("</div>", unsafe_allow_html=True)
+
 # -----------------------------
 # Stats
 # -----------------------------
+profiler.mark("stats")
 st.markdown("<div class='card'>", unsafe_allow_html=True)
 st.markdown("<div class='section-title'>📊 Key Performance Metrics</div>", unsafe_allow_html=True)
 
@@ -328,29 +140,176 @@ col1, col2, col3, col4 = st.columns(4)
 
 with col1:
     st.markdown("<div class='metric-container'>", unsafe_allow_html=True)
-    st.metric("🔝 Peak Energy", f"{df['Energy'].max()}%")
+    st.metric("🔝 Peak Energy", f"{metrics['peak']}%",
+              f"+{metrics['boosts'][0]:.0f} morning boost" if metrics['boosts'] else None)
     st.markdown("</div>", unsafe_allow_html=True)
 
 with col2:
     st.markdown("<div class='metric-container'>", unsafe_allow_html=True)
-    st.metric("⚡ Average", f"{round(df['Energy'].mean(),1)}%")
+    st.metric("⚡ Average", f"{metrics['average']}%",
+              f"{metrics['hours_above']:.1f} h ≥ {metrics['threshold']}%", delta_color="off")
     st.markdown("</div>", unsafe_allow_html=True)
 
 with col3:
     st.markdown("<div class='metric-container'>", unsafe_allow_html=True)
-    st.metric("☕ Daily Coffees", "2")
+    st.metric("☕ Daily Coffees", str(cups))
     st.markdown("</div>", unsafe_allow_html=True)
 
 with col4:
     st.markdown("<div class='metric-container'>", unsafe_allow_html=True)
-    st.metric("⏰ Coffee Times", "7:30 & 14:00")
+    st.metric("⏰ Coffee Times", metrics['times'])
     st.markdown("</div>", unsafe_allow_html=True)
 
+# Threshold crossings on the interpolated minute curve
+zones = " · ".join(f"{'↗' if direction > 0 else '↘'} {clock}" for clock, direction in metrics['crossings'])
+st.caption(
+    f"Crossing {metrics['threshold']}% energy: {zones or 'never'} · "
+    f"Tolerance from recent days: caffeine works at {metrics['sensitivity']:.0%} of a habitual day"
+)
+
+st.markdown("</div>", unsafe_allow_html=True)
+
+# -----------------------------
+# What-if - only this fragment reruns when a cup moves
+# -----------------------------
+WHATIF_DOSES = (0, 63, 95, 150, 200)  # mg; 0 drops the cup
+WHATIF_MAX_CUPS = 5
+WHATIF_FIRST, WHATIF_LAST, WHATIF_STEP = 6 * 60, 21 * 60, 5  # slider range and step, minutes of the day
+
+
+@st.fragment
+def what_if():
+    from datetime import time, timedelta
+
+    from chart import build_whatif_figure, update_whatif_figure
+    from energy_model import DEFAULT_PARAMS, format_clock, parse_clock
+    from whatif import WhatIfDay
+
+    if "whatif_day" not in st.session_state:
+        params = DEFAULT_PARAMS.with_updates(sensitivity=DEFAULT_PARAMS.sensitivity * metrics['sensitivity'])
+        day = WhatIfDay(schedule, params, threshold=metrics['threshold'])
+        st.session_state.whatif_day = day
+        st.session_state.whatif_fig = build_whatif_figure(day.minutes)
+        st.session_state.whatif_start = list(schedule.items())
+        st.session_state.whatif_today = day.metrics()
+    day, what_if_fig = st.session_state.whatif_day, st.session_state.whatif_fig
+    start, today = st.session_state.whatif_start, st.session_state.whatif_today
+
+    if len(start) < WHATIF_MAX_CUPS and st.button("➕ Add a cup"):
+        start.append(("12:00", 95.0))
+
+    # Sliders only send their value on release, which debounces a drag into one update
+    cups = []
+    for i, (clock, dose) in enumerate(start):
+        left, right = st.columns([3, 1])
+        # Logged cups can sit off the slider grid: snap the time into range, keep the dose as an option
+        minute = round(parse_clock(clock) / WHATIF_STEP) * WHATIF_STEP
+        minute = min(max(minute, WHATIF_FIRST), WHATIF_LAST)
+        picked = left.slider(f"☕ Cup {i + 1}", min_value=time(WHATIF_FIRST // 60, WHATIF_FIRST % 60),
+                             max_value=time(WHATIF_LAST // 60, WHATIF_LAST % 60),
+                             value=time(minute // 60, minute % 60), step=timedelta(minutes=WHATIF_STEP),
+                             format="H:mm", key=f"whatif_time_{i}")
+        dose = round(dose)
+        mg = right.select_slider("mg", options=sorted({*WHATIF_DOSES, dose}), value=dose, key=f"whatif_dose_{i}")
+        if mg:
+            cups.append((picked.hour * 60 + picked.minute, mg))
+
+    lo, hi = day.update(cups)
+    star_minutes, star_energy = day.stars()
+    update_whatif_figure(what_if_fig, day.energy, star_minutes, star_energy,
+                         [f"☕ {dose:.0f} mg" for _, dose, _ in day.cups])
+    st.plotly_chart(what_if_fig, use_container_width=True, key="whatif_chart")
+
+    outcome = day.metrics()
+    what1, what2, what3, what4 = st.columns(4)
+    what1.metric("🔝 Peak", f"{outcome['peak']}%", f"{outcome['peak'] - today['peak']:+d} vs today")
+    what2.metric("⚡ Average", f"{outcome['average']}%", f"{outcome['average'] - today['average']:+.1f} vs today")
+    what3.metric("🎯 In Zone", f"{outcome['hours_above']:.1f} h",
+                 f"{outcome['hours_above'] - today['hours_above']:+.1f} h vs today")
+    what4.metric("☕ Caffeine", f"{outcome['caffeine_mg']:.0f} mg")
+    changed = (f"recomputed {format_clock(day.minutes[lo])}-{format_clock(day.minutes[hi - 1])}"
+               if lo < hi else "nothing to recompute")
+    st.caption(f"Drag a cup to try another day - {changed} in {day.seconds * 1e3:.2f} ms.")
+
+
+profiler.mark("what-if")
+st.markdown("<div class='card'>", unsafe_allow_html=True)
+st.markdown("<div class='section-title'>🎛️ What If</div>", unsafe_allow_html=True)
+what_if()
+st.markdown("</div>", unsafe_allow_html=True)
+
+# -----------------------------
+# History Explorer - zoom picks the matching pyramid tier
+# -----------------------------
+profiler.mark("history")
+import pandas as pd
+
+from pipeline import (
+    HISTORY_DAYS,
+    HISTORY_USER,
+    PRODUCTIVITY_THRESHOLD,
+    SLOT_MINUTES,
+    calendar_figure,
+    daily_params,
+    energy_pyramid,
+    history_calendar,
+    history_figure,
+    history_version,
+    history_memory_report,
+    history_stats,
+    scenario_comparison,
+    schedule_comparison,
+    small_multiples_figure,
+)
+
+st.markdown("<div class='card'>", unsafe_allow_html=True)
+st.markdown("<div class='section-title'>🗓️ Energy History</div>", unsafe_allow_html=True)
+
+# Changes whenever HISTORY_USER's stored logs do, so every history cache below sees new days
+history_key = history_version(HISTORY_USER)
+first, last = (t.to_pydatetime() for t in energy_pyramid(HISTORY_DAYS, None, HISTORY_USER, history_key).span)
+visible = st.slider(
+    "Visible range",
+    min_value=first,
+    max_value=last,
+    value=(last - pd.Timedelta(days=30).to_pytimedelta(), last),
+    format="YYYY-MM-DD HH:mm"
+)
+tier, history_fig = history_figure(*visible, HISTORY_DAYS, None, HISTORY_USER, history_key)
+st.plotly_chart(history_fig, use_container_width=True)
+profiler.payload_figure(history_fig)
+long_run, long_run_days = history_stats(HISTORY_DAYS, None, HISTORY_USER, version=history_key)
+st.caption(
+    f"Showing {tier} aggregates - narrow the range to load finer tiers. "
+    f"All days: mean {long_run.mean:.1f}% (σ {long_run.std:.1f}), "
+    f"{long_run.minutes_above / 60 / long_run_days:.1f} h/day at or above {PRODUCTIVITY_THRESHOLD}%."
+)
+st.markdown("</div>", unsafe_allow_html=True)
+
+# -----------------------------
+# Energy Calendar - one heatmap matrix and one small-multiples trace, however long the history
+# -----------------------------
+profiler.mark("calendar")
+st.markdown("<div class='card'>", unsafe_allow_html=True)
+st.markdown("<div class='section-title'>📅 Energy Calendar</div>", unsafe_allow_html=True)
+
+calendar_fig = calendar_figure(HISTORY_DAYS, None, HISTORY_USER, history_key)
+st.plotly_chart(calendar_fig, use_container_width=True)
+profiler.payload_figure(calendar_fig)
+
+calendar_days = [str(day) for day in history_calendar(HISTORY_DAYS, None, HISTORY_USER, history_key)[0]]
+picked = st.multiselect("Compare days", options=calendar_days, default=calendar_days[-5:], max_selections=7)
+if picked:
+    panels_fig = small_multiples_figure(tuple(picked), HISTORY_DAYS, None, HISTORY_USER, history_key)
+    st.plotly_chart(panels_fig, use_container_width=True)
+    profiler.payload_figure(panels_fig)
+st.caption(f"{SLOT_MINUTES}-minute means per day; pick days above to compare them side by side.")
 st.markdown("</div>", unsafe_allow_html=True)
 
 # -----------------------------
 # Analysis
 # -----------------------------
+profiler.mark("analysis")
 st.markdown("<div class='card'>", unsafe_allow_html=True)
 st.markdown("<div class='section-title'>🎯 Key Insights</div>", unsafe_allow_html=True)
 
@@ -362,36 +321,80 @@ st.markdown(
     
     **Morning Coffee (7:30 AM):**
     - Consumed 30-60 minutes after waking up (avoiding cortisol spike)
-    - Creates a strong energy boost from ~25% to 85% by 9:00 AM
+    - Creates a strong energy boost from ~20% to nearly 80% by 9:00 AM
     - Sustains high productivity through the entire morning
     
     **Afternoon Coffee (14:00):**
     - Strategically timed to combat the post-lunch energy dip
     - Prevents the typical 2 PM crash
-    - **Lower effectiveness due to caffeine tolerance** - reaches only 70% vs morning's 85%
+    - **Lower effectiveness due to caffeine tolerance** - reaches only ~68% vs morning's ~78%
     - More modest boost reflects biological reality of afternoon caffeine response
     - Consumed early enough to avoid sleep disruption
     
     ### 📈 Performance Pattern
     
     This two-coffee approach creates **two distinct productivity peaks** with realistic expectations:
-    - **Morning Peak (9:00-10:00):** 82-85% energy - ideal for deep, focused work
-    - **Afternoon Peak (16:00):** 70% energy - suitable for lighter tasks and collaboration
+    - **Morning Peak (9:00-10:00):** 76-78% energy - ideal for deep, focused work
+    - **Afternoon Peak (15:30):** ~68% energy - suitable for lighter tasks and collaboration
     
     The curve demonstrates sustainable energy management, showing the natural decline in caffeine effectiveness throughout the day without the crashes that come from overcaffeination.
     """,
     unsafe_allow_html=True
 )
 
+# Energy states - resized WebP variants, the browser fetches the one that fits
+state1, state2 = st.columns(2)
+state1.markdown(
+    f"<div class='energy-state'>{responsive_image('happy', 'Energized after coffee', '220px')}"
+    f"<p>☀️ Caffeinated peak - {metrics['peak']}%</p></div>",
+    unsafe_allow_html=True
+)
+state2.markdown(
+    f"<div class='energy-state'>{responsive_image('tired', 'Tired during the energy dip', '220px')}"
+    f"<p>😴 Before coffee and the evening dip</p></div>",
+    unsafe_allow_html=True
+)
+
+# Schedule optimizer - compare the current strategy with the best candidate found
+best, current_above = schedule_comparison(schedule, PRODUCTIVITY_THRESHOLD, daily_params())
+
+st.markdown(
+    f"""
+    ### 🧮 Optimized Schedule
+
+    Searching every 1-3 cup schedule between 6:30 and 16:00 (15-minute steps, 63-150 mg per cup)
+    for the most time above {PRODUCTIVITY_THRESHOLD}% energy while keeping bedtime caffeine low:
+    - **Best found:** {best.label} ({best.doses[0]:.0f} mg each) - {best.minutes_above / 60:.1f} h above {PRODUCTIVITY_THRESHOLD}%,
+      {best.bedtime_caffeine:.0f} mg left at 22:00
+    - **Current strategy:** {metrics['times']} - {current_above / 60:.1f} h above {PRODUCTIVITY_THRESHOLD}%
+    """
+)
+
+st.markdown("</div>", unsafe_allow_html=True)
+
+# -----------------------------
+# Scenario comparison - scenarios simulated concurrently, one shared time axis
+# -----------------------------
+profiler.mark("scenarios")
+st.markdown("<div class='card'>", unsafe_allow_html=True)
+st.markdown("<div class='section-title'>⚖️ Scenario Comparison</div>", unsafe_allow_html=True)
+
+scenario_fig, scenario_table = scenario_comparison(threshold=PRODUCTIVITY_THRESHOLD, params=daily_params())
+st.plotly_chart(scenario_fig, use_container_width=True)
+profiler.payload_figure(scenario_fig)
+st.dataframe(scenario_table, use_container_width=True)
+st.caption("Decaf switch: the afternoon cup swapped for decaf, which still carries a few mg of caffeine.")
 st.markdown("</div>", unsafe_allow_html=True)
 
 # -----------------------------
 # Author Section
 # -----------------------------
+profiler.mark("author")
 st.markdown("<div class='author-section'>", unsafe_allow_html=True)
 
 st.markdown(
-    """
+    f"""
+    {responsive_image('profile', 'Author photo', '96px', 'photo-avatar')}
     <p class='author-label'>PRESENTED BY</p>
     <p class='author-name'>MOHAMED BOUSSOFFARA</p>
     """,
@@ -399,3 +402,34 @@ st.markdown(
 )
 st.markdown("</div>", unsafe_allow_html=True)
 
+# -----------------------------
+# Cache statistics
+# -----------------------------
+profiler.mark("diagnostics")
+with st.expander("⚙️ Cache statistics"):
+    st.dataframe(
+        pd.DataFrame([
+            {"Step": name.split(".")[-1], "Hits": s.hits, "Misses": s.misses, "Hit rate": f"{s.hit_rate:.0%}",
+             "Evictions": s.evictions + s.expirations, "Entries": f"{s.size}/{s.maxsize}"}
+            for name, s in cache_stats().items()
+        ]),
+        hide_index=True,
+        use_container_width=True
+    )
+
+with st.expander("🧠 Data footprint"):
+    report = history_memory_report()
+    totals = report.groupby("Frame", sort=False)["Bytes"].sum()
+    st.caption(
+        f"One-year minute history: {totals['compact'] / 1e6:.1f} MB compact vs "
+        f"{totals['legacy'] / 1e6:.1f} MB in the string layout ({totals['legacy'] / totals['compact']:.1f}x)."
+    )
+    st.dataframe(report, hide_index=True, use_container_width=True)
+
+# -----------------------------
+# Profiling panel - timings of this rerun, also exported to profile.jsonl / profile.prom
+# -----------------------------
+sections = profiler.finish()
+if sections:
+    with st.expander("⏱️ Section profile"):
+        st.dataframe(pd.DataFrame(sections), hide_index=True, use_container_width=True)
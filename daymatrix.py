@@ -0,0 +1,72 @@
+"""Day x time-of-day views of a long energy history.
+
+``day_matrix`` folds any number of samples into one ``(days, slots)`` matrix of
+slot means with a single ``bincount`` pass, so a heatmap of years of minute
+data is one small array rather than one trace per day.  ``day_panels`` lays
+a few chosen days side by side as a single NaN-separated series for small
+multiples.
+"""
+
+import numpy as np
+
+SLOT_MINUTES = 15
+PANEL_GAP = 60  # minutes of empty axis between two small-multiple panels
+MINUTES_PER_DAY = 1440
+
+
+def _day_and_minute(times) -> tuple:
+    minutes = np.asarray(times).astype("datetime64[m]").astype(np.int64)
+    return minutes // MINUTES_PER_DAY, minutes % MINUTES_PER_DAY
+
+
+def day_matrix(times, energy, slot_minutes: int = SLOT_MINUTES) -> tuple:
+    """``(dates, slot_starts, means)`` with ``means`` of shape ``(days, slots)``, NaN where nothing was logged.
+
+    Every calendar day from the first to the last sample gets a row, and the
+    slots cover the time of day that any sample falls in.
+    """
+    day, minute = _day_and_minute(times)
+    energy = np.asarray(energy, dtype=np.float64)
+    if len(day) == 0:
+        return np.array([], dtype="datetime64[D]"), np.array([], dtype=np.float64), np.empty((0, 0), np.float32)
+
+    slot = minute // slot_minutes
+    first_slot, last_slot = slot.min(), slot.max()
+    rows, cols = day.max() - day.min() + 1, last_slot - first_slot + 1
+    flat = (day - day.min()) * cols + (slot - first_slot)
+    sums = np.bincount(flat, weights=energy, minlength=rows * cols)
+    counts = np.bincount(flat, minlength=rows * cols)
+    with np.errstate(invalid="ignore"):
+        means = (sums / counts).astype(np.float32).reshape(rows, cols)
+
+    dates = (day.min() + np.arange(rows)).astype("datetime64[D]")
+    slot_starts = (first_slot + np.arange(cols)) * float(slot_minutes)
+    return dates, slot_starts, means
+
+
+def day_panels(times, energy, days, gap_minutes: int = PANEL_GAP) -> tuple:
+    """``(x, y, offsets, span)`` of ``days`` side by side in date order, panels separated by NaN.
+
+    ``x`` is in minutes along a shared axis; panel ``i`` holds minute-of-day
+    ``m`` at ``offsets[i] + m``.  Every panel covers the same ``span`` =
+    ``(first, last)`` minute of day seen in the selected days, so nights do
+    not take up room.
+    """
+    day, minute = _day_and_minute(times)
+    energy = np.asarray(energy, dtype=np.float64)
+    wanted = np.unique(np.asarray(days, dtype="datetime64[D]").astype(np.int64))
+    panel = np.searchsorted(wanted, day)
+    keep = np.isin(day, wanted)
+    if not keep.any():
+        return np.array([]), np.array([]), np.array([]), (0, 0)
+    panel, minute, energy = panel[keep], minute[keep], energy[keep]
+
+    lo, hi = minute.min(), minute.max()
+    width = hi - lo + gap_minutes
+    offsets = np.arange(len(wanted)) * float(width) - lo
+    # Samples in time order per panel, then one NaN after each panel breaks the line
+    order = np.lexsort((minute, panel))
+    x = offsets[panel[order]] + minute[order]
+    y = energy[order]
+    breaks = np.flatnonzero(np.diff(panel[order])) + 1
+    return np.insert(x, breaks, np.nan), np.insert(y, breaks, np.nan), offsets, (int(lo), int(hi))
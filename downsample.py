@@ -0,0 +1,39 @@
+"""Shape-preserving downsampling for long energy series."""
+
+import numpy as np
+
+
+def lttb(x, y, threshold: int) -> np.ndarray:
+    """Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    The global minimum and maximum are always kept as well, so peaks survive
+    downsampling exactly.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Interior points are split into threshold - 2 buckets; first and last are fixed
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+
+    # Average point of every bucket, used as the third triangle corner
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    mean_x = np.append(sums_x / counts, x[-1])
+    mean_y = np.append(sums_y / counts, y[-1])
+
+    selected = 0
+    for bucket in range(threshold - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        ax, ay = x[selected], y[selected]
+        cx, cy = mean_x[bucket + 1], mean_y[bucket + 1]
+        area = np.abs((ax - cx) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (cy - ay))
+        selected = lo + int(np.argmax(area))
+        keep[bucket + 1] = selected
+
+    return np.union1d(keep, [np.argmin(y), np.argmax(y)])
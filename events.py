@@ -0,0 +1,43 @@
+"""Coffee intake events as a time-indexed table, joined to energy series.
+
+Events are kept sorted by minute of day.  Placing them on an energy series is
+an as-of style join: one binary search per event into the sorted sample
+times plus linear interpolation, so event times do not have to match the
+sampling grid and the cost is O((n + k) log n) instead of one scan per event.
+"""
+
+import numpy as np
+import pandas as pd
+
+from energy_model import format_clock, parse_clock
+
+
+def intake_events(schedule: dict, drink: str = "coffee") -> pd.DataFrame:
+    minutes = np.array([parse_clock(h) for h in schedule], dtype=np.int64)
+    events = pd.DataFrame(
+        {"Drink": drink, "Dose": np.asarray(list(schedule.values()), dtype=np.float64)},
+        index=pd.Index(minutes, name="Minute"),
+    )
+    events = events.sort_index()
+    events["Clock"] = [format_clock(m) for m in events.index]
+    events["Label"] = event_labels(len(events))
+    return events
+
+
+def event_labels(count: int) -> list:
+    if count == 2:
+        return ["☕ Morning", "☕ Afternoon"]
+    return [f"☕ Coffee {i + 1}" for i in range(count)]
+
+
+def join_energy(events: pd.DataFrame, minutes, energy) -> pd.DataFrame:
+    """Copy of ``events`` with the ``Energy`` interpolated at every event time.
+
+    ``minutes`` must be sorted; events outside the series get NaN.
+    """
+    minutes = np.asarray(minutes, dtype=np.float64)
+    energy = np.asarray(energy, dtype=np.float64)
+    at = events.index.to_numpy(dtype=np.float64)
+    joined = events.copy()
+    joined["Energy"] = np.interp(at, minutes, energy, left=np.nan, right=np.nan)
+    return joined
@@ -0,0 +1,126 @@
+"""SQLite store for logged drinks (user, timestamp, drink type, dose).
+
+Rows are indexed on ``(user, ts)`` so per-user time-range queries are index
+range scans however many cups are logged.  Timestamps are integer seconds
+since the epoch; inserts are batched into one transaction.  pandas is only
+imported by ``query()``, so reading a day's schedule stays cheap at startup.
+"""
+
+import os
+import sqlite3
+from contextlib import closing
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from energy_model import format_clock
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_PATH = "coffee_events.db"  # unless COFFEE_DB is set when the store is opened
+DEFAULT_USER = os.environ.get("COFFEE_USER") or "me"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS intake (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    drink TEXT NOT NULL,
+    dose_mg REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS intake_user_ts ON intake (user, ts);
+"""
+
+
+def _epoch(value) -> int:
+    return int(np.datetime64(value, "s").astype(np.int64))
+
+
+class IntakeStore:
+    def __init__(self, path=None):
+        self.path = str(path or os.environ.get("COFFEE_DB") or DEFAULT_PATH)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per call, so Streamlit session threads never share one
+        return sqlite3.connect(self.path, timeout=10.0)
+
+    def add_many(self, user: str, rows) -> int:
+        """Insert ``(timestamp, drink, dose_mg)`` rows in one transaction; returns the row count."""
+        batch = [(user, _epoch(ts), drink, float(dose)) for ts, drink, dose in rows]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("INSERT INTO intake (user, ts, drink, dose_mg) VALUES (?, ?, ?, ?)", batch)
+        return len(batch)
+
+    def rows(self, user: str, start, end) -> list:
+        """``(epoch seconds, drink, dose_mg)`` rows logged in ``[start, end)`` ordered by time."""
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT ts, drink, dose_mg FROM intake WHERE user = ? AND ts >= ? AND ts < ? ORDER BY ts",
+                (user, _epoch(start), _epoch(end)),
+            ).fetchall()
+
+    def query(self, user: str, start, end) -> "pd.DataFrame":
+        """Drinks logged in ``[start, end)`` ordered by time."""
+        import pandas as pd
+
+        rows = self.rows(user, start, end)
+        ts, drink, dose = zip(*rows) if rows else ((), (), ())
+        return pd.DataFrame({
+            "Time": np.array(ts, dtype=np.int64).astype("datetime64[s]"),
+            "Drink": list(drink),
+            "Dose": np.array(dose, dtype=np.float64),
+        })
+
+    def count(self, user: str, start, end) -> int:
+        with closing(self._connect()) as conn:
+            (n,) = conn.execute(
+                "SELECT COUNT(*) FROM intake WHERE user = ? AND ts >= ? AND ts < ?",
+                (user, _epoch(start), _epoch(end)),
+            ).fetchone()
+        return n
+
+    def daily_totals(self, users, start, end) -> np.ndarray:
+        """``(users, days)`` caffeine mg per UTC day in ``[start, end)``, NaN on days with nothing logged."""
+        start, end = np.datetime64(start, "D"), np.datetime64(end, "D")
+        users = list(users)
+        totals = np.full((len(users), int((end - start).astype(np.int64))), np.nan)
+        row = {user: i for i, user in enumerate(users)}
+        first = _epoch(start) // 86400
+        with closing(self._connect()) as conn:
+            # One grouped range scan per user over the (user, ts) index
+            for user in users:
+                for day, mg in conn.execute(
+                    "SELECT ts / 86400, SUM(dose_mg) FROM intake "
+                    "WHERE user = ? AND ts >= ? AND ts < ? GROUP BY ts / 86400",
+                    (user, _epoch(start), _epoch(end)),
+                ):
+                    totals[row[user], day - first] = mg
+        return totals
+
+    def day_count(self, user: str, day=None) -> int:
+        """Drinks logged on ``day``; drinks in the same minute count separately."""
+        day = np.datetime64(day or "today", "D")
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM intake WHERE user = ? AND ts >= ? AND ts < ?",
+                (user, _epoch(day), _epoch(day + 1)),
+            ).fetchone()[0]
+
+    def day_schedule(self, user: str, day=None, default: dict | None = None) -> dict:
+        """The day's drinks as ``{clock: dose_mg}``; an empty day returns ``default`` without logging it."""
+        day = np.datetime64(day or "today", "D")
+        rows = self.rows(user, day, day + 1)
+        if not rows and default:
+            # Only real drinks are stored, so the default never feeds the tolerance history
+            return dict(default)
+
+        schedule = {}
+        start = _epoch(day)
+        for ts, _, dose in rows:
+            clock = format_clock((ts - start) // 60)
+            schedule[clock] = schedule.get(clock, 0.0) + dose
+        return schedule
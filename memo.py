@@ -0,0 +1,96 @@
+"""Bounded, thread-safe memoization with LRU + TTL eviction and hit/miss counters.
+
+Streamlit reruns the whole page for every interaction and every session, so
+the expensive steps (data generation, simulations, figure construction,
+metrics) are wrapped with ``@memoize`` and keyed by their arguments.  The
+counters are exposed through ``cache_stats()`` for the debug panel.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import wraps
+
+import numpy as np
+
+_REGISTRY = {}
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    size: int = 0
+    maxsize: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def _freeze(value):
+    # Turn arguments into a hashable key; arrays are keyed by dtype, shape and bytes
+    if isinstance(value, np.ndarray):
+        return ("ndarray", value.dtype.str, value.shape, value.tobytes())
+    if isinstance(value, dict):
+        return ("dict", tuple((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(_freeze(v) for v in value))
+    return value
+
+
+def memoize(maxsize: int = 32, ttl: float | None = None):
+    """Cache results by arguments, keeping at most ``maxsize`` entries for ``ttl`` seconds."""
+
+    def decorator(func):
+        entries = OrderedDict()
+        stats = CacheStats(maxsize=maxsize)
+        lock = threading.Lock()
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = _freeze((args, tuple(sorted(kwargs.items()))))
+            now = time.monotonic()
+            with lock:
+                entry = entries.get(key)
+                if entry is not None:
+                    stored_at, value = entry
+                    if ttl is None or now - stored_at < ttl:
+                        entries.move_to_end(key)
+                        stats.hits += 1
+                        return value
+                    del entries[key]
+                    stats.expirations += 1
+                stats.misses += 1
+
+            # Compute outside the lock so slow misses do not block hits on other keys
+            value = func(*args, **kwargs)
+
+            with lock:
+                entries[key] = (now, value)
+                entries.move_to_end(key)
+                while len(entries) > maxsize:
+                    entries.popitem(last=False)
+                    stats.evictions += 1
+                stats.size = len(entries)
+            return value
+
+        def cache_clear():
+            with lock:
+                entries.clear()
+                stats.size = 0
+
+        wrapper.cache_stats = lambda: stats
+        wrapper.cache_clear = cache_clear
+        _REGISTRY[f"{func.__module__}.{func.__qualname__}"] = wrapper
+        return wrapper
+
+    return decorator
+
+
+def cache_stats() -> dict:
+    return {name: func.cache_stats() for name, func in _REGISTRY.items()}
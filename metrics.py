@@ -0,0 +1,123 @@
+"""Incremental energy metrics: peak, mean/variance, time in zone and coffee boosts.
+
+``EnergyStats`` is updated with batches of samples as they arrive.  Mean and
+variance use Welford's update, combined across batches with Chan's parallel
+formula, so partial aggregates for different days or users merge exactly
+and a dashboard over any amount of history only touches the new samples.
+Time in zone weights each sample by the time since the one before it, so
+it holds for any sampling rate, including streams that change rate.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+BOOST_WINDOW = 150.0  # minutes after a cup in which its peak is measured
+MAX_GAP = 60.0  # longer steps between samples are missing data, not time in zone
+
+
+def _as_minutes(times) -> np.ndarray:
+    times = np.asarray(times)
+    if np.issubdtype(times.dtype, np.datetime64):
+        return times.astype("datetime64[s]").astype(np.int64) / 60.0
+    return times.astype(np.float64)
+
+
+@dataclass
+class EnergyStats:
+    threshold: float = 60.0
+    max_gap: float = MAX_GAP
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    peak: float = -np.inf
+    peak_time: float = np.nan
+    minutes_above: float = 0.0
+    last_time: float = np.nan  # latest sample seen, where the next batch's first step starts
+    boosts: list = field(default_factory=list)
+    pending: list = field(default_factory=list)  # [coffee time, energy at intake, best since]
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+
+    # -----------------------------
+    # Updates
+    # -----------------------------
+    def add_coffee(self, time) -> None:
+        self.pending.append([float(_as_minutes([time])[0]), np.nan, -np.inf])
+
+    def update(self, times, energy) -> "EnergyStats":
+        times = _as_minutes(times)
+        energy = np.asarray(energy, dtype=np.float64)
+        n = len(energy)
+        if n == 0:
+            return self
+
+        # Welford over the batch, then Chan's combination with the running totals
+        batch_mean = float(energy.mean())
+        batch_m2 = float(((energy - batch_mean) ** 2).sum())
+        self._combine(n, batch_mean, batch_m2)
+
+        top = int(np.argmax(energy))
+        if energy[top] > self.peak:
+            self.peak, self.peak_time = float(energy[top]), float(times[top])
+        # Each sample stands for the step since the previous one, across batches too
+        steps = np.diff(times, prepend=self.last_time)
+        steps = np.where((steps > 0) & (steps <= self.max_gap), steps, 0.0)
+        self.minutes_above += float(steps[energy >= self.threshold].sum())
+        self.last_time = float(np.fmax(self.last_time, times[-1]))
+
+        self._update_boosts(times, energy)
+        return self
+
+    def _combine(self, n: int, mean: float, m2: float) -> None:
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+
+    def _update_boosts(self, times, energy) -> None:
+        still_open = []
+        for coffee in self.pending:
+            start, base, best = coffee
+            window = (times >= start) & (times <= start + BOOST_WINDOW)
+            if window.any():
+                if np.isnan(base):
+                    coffee[1] = base = float(energy[np.argmax(window)])
+                coffee[2] = best = max(best, float(energy[window].max()))
+            if times[-1] > start + BOOST_WINDOW:
+                if not np.isnan(base):
+                    self.boosts.append(best - base)
+            else:
+                still_open.append(coffee)
+        self.pending = still_open
+
+    # -----------------------------
+    # Merging partial aggregates
+    # -----------------------------
+    def merge(self, other: "EnergyStats") -> "EnergyStats":
+        """Combined stats of two disjoint sample sets (other days, other users)."""
+        merged = EnergyStats(
+            threshold=self.threshold,
+            max_gap=self.max_gap,
+            count=self.count,
+            mean=self.mean,
+            m2=self.m2,
+            peak=self.peak,
+            peak_time=self.peak_time,
+            minutes_above=self.minutes_above + other.minutes_above,
+            last_time=float(np.fmax(self.last_time, other.last_time)),
+            boosts=self.boosts + other.boosts,
+            pending=self.pending + other.pending,
+        )
+        if other.count:
+            merged._combine(other.count, other.mean, other.m2)
+        if other.peak > merged.peak:
+            merged.peak, merged.peak_time = other.peak, other.peak_time
+        return merged
@@ -0,0 +1,141 @@
+"""Search for the coffee schedule that keeps energy above a productivity threshold.
+
+Candidates are scored in bulk: every schedule becomes a row of dose impulses
+on a 1-minute grid, and all rows are convolved with the caffeine kernel at
+once through a real FFT.  The energy response, time above threshold and
+caffeine left at bedtime then follow as whole-array operations.
+"""
+
+from dataclasses import dataclass
+from itertools import combinations
+
+import numpy as np
+
+from energy_model import (
+    DEFAULT_PARAMS,
+    LN2,
+    ModelParams,
+    baseline_energy,
+    bateman,
+    caffeine_effect,
+    format_clock,
+    parse_clock,
+)
+
+DEFAULT_DOSES_MG = (63.0, 95.0, 150.0)  # espresso, brewed cup, large mug
+
+
+@dataclass(frozen=True)
+class ScheduleScore:
+    times: tuple
+    doses: tuple
+    minutes_above: float
+    bedtime_caffeine: float
+    score: float
+
+    @property
+    def label(self) -> str:
+        return " & ".join(format_clock(t) for t in self.times)
+
+
+# -----------------------------
+# Candidate grid
+# -----------------------------
+def candidate_schedules(
+    cups=(1, 2, 3),
+    earliest: str = "6:30",
+    latest: str = "16:00",
+    step: int = 15,
+    doses=DEFAULT_DOSES_MG,
+    min_gap: int = 120,
+):
+    """Padded ``(times, doses)`` arrays of shape ``(candidates, max(cups))``."""
+    slots = np.arange(parse_clock(earliest), parse_clock(latest) + 1, step)
+    width = max(cups)
+    times, amounts = [], []
+    for count in cups:
+        picks = np.array(list(combinations(slots, count)), dtype=np.float64).reshape(-1, count)
+        picks = picks[(np.diff(picks, axis=1) >= min_gap).all(axis=1)]
+        for dose in doses:
+            padded = np.zeros((len(picks), width))
+            padded[:, :count] = picks
+            times.append(padded)
+            amounts.append(np.pad(np.full((len(picks), count), dose), ((0, 0), (0, width - count))))
+    return np.concatenate(times), np.concatenate(amounts)
+
+
+# -----------------------------
+# Bulk scoring
+# -----------------------------
+def _unit_kernel(n: int, params: ModelParams) -> np.ndarray:
+    # Caffeine from a 1 mg dose, 0..n-1 minutes after intake
+    ke = LN2 / params.half_life
+    ka = LN2 / params.absorption_half_life
+    return bateman(np.arange(n, dtype=np.float64), ka, ke)
+
+
+def score_schedules(
+    dose_times,
+    doses,
+    threshold: float = 60.0,
+    start: str = "6:00",
+    bedtime: str = "22:00",
+    bedtime_limit: float = 50.0,
+    penalty: float = 10.0,
+    daily_limit: float = 400.0,
+    params: ModelParams = DEFAULT_PARAMS,
+    chunk_size: int = 4096,
+):
+    """Minutes above ``threshold``, caffeine at bedtime and the combined score per candidate.
+
+    Every mg of caffeine left above ``bedtime_limit`` costs ``penalty`` minutes;
+    schedules over ``daily_limit`` mg in total are ruled out.
+    """
+    dose_times = np.atleast_2d(np.asarray(dose_times, dtype=np.float64))
+    doses = np.atleast_2d(np.asarray(doses, dtype=np.float64))
+    first = parse_clock(start)
+    minutes = np.arange(first, parse_clock(bedtime) + 1, dtype=np.float64)
+    n = len(minutes)
+    size = 1 << int(np.ceil(np.log2(2 * n)))  # zero padding turns circular into linear convolution
+
+    kernel_f = np.fft.rfft(_unit_kernel(n, params), size)
+    baseline = baseline_energy(minutes, params)
+
+    # Same-day ranking is fixed per candidate, so acute tolerance is a per-impulse weight
+    order = np.argsort(np.where(doses > 0, dose_times, np.inf), axis=1)
+    rank = np.empty_like(order)
+    np.put_along_axis(rank, order, np.arange(doses.shape[1]), axis=1)
+    weights = doses * (1.0 - params.acute_tolerance) ** rank
+
+    slots = np.clip(np.rint(dose_times - first).astype(np.int64), 0, n - 1)
+    above = np.empty(len(doses))
+    at_bedtime = np.empty(len(doses))
+    for lo in range(0, len(doses), chunk_size):
+        hi = min(lo + chunk_size, len(doses))
+        impulses = np.zeros((hi - lo, n))
+        np.add.at(impulses, (np.arange(hi - lo)[:, None], slots[lo:hi]), weights[lo:hi])
+        level = np.fft.irfft(np.fft.rfft(impulses, size, axis=1) * kernel_f, size, axis=1)[:, :n]
+        energy = baseline + caffeine_effect(level, params)
+        above[lo:hi] = (energy >= threshold).sum(axis=1)
+        at_bedtime[lo:hi] = level[:, -1]
+
+    score = above - penalty * np.maximum(at_bedtime - bedtime_limit, 0.0)
+    score[doses.sum(axis=1) > daily_limit] = -np.inf
+    return above, at_bedtime, score
+
+
+def optimize_schedule(top: int = 5, candidates=None, **scoring) -> list:
+    """Best ``top`` schedules from ``candidates`` (default: ``candidate_schedules()``)."""
+    dose_times, doses = candidates if candidates is not None else candidate_schedules()
+    above, at_bedtime, score = score_schedules(dose_times, doses, **scoring)
+    best = np.argsort(-score, kind="stable")[:top]
+    return [
+        ScheduleScore(
+            times=tuple(dose_times[i][doses[i] > 0].tolist()),
+            doses=tuple(doses[i][doses[i] > 0].tolist()),
+            minutes_above=float(above[i]),
+            bedtime_caffeine=float(at_bedtime[i]),
+            score=float(score[i]),
+        )
+        for i in best
+    ]
@@ -0,0 +1,362 @@
+"""Cached data, figure and metrics pipeline behind the Streamlit page.
+
+Every step is keyed by its inputs (the coffee schedule and model parameters),
+so a rerun with unchanged inputs is served from ``memo`` caches.  Nothing here
+imports Streamlit, which keeps the pipeline usable from scripts as well.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+from chart import (
+    build_energy_figure,
+    build_heatmap_figure,
+    build_history_figure,
+    build_scenario_figure,
+    build_small_multiples_figure,
+    scenario_trace,
+)
+from daymatrix import SLOT_MINUTES, day_matrix, day_panels
+from energy_model import (
+    DEFAULT_DOSE_MG,
+    DEFAULT_PARAMS,
+    ModelParams,
+    energy_curve,
+    format_clock,
+    minutes_grid,
+    parse_clock,
+)
+from events import intake_events, join_energy
+from interpolate import pchip, threshold_crossings
+from intake_store import DEFAULT_USER, IntakeStore
+from memo import memoize
+from metrics import EnergyStats
+from optimizer import optimize_schedule
+from population import population_bands
+from pyramid import EnergyPyramid
+from schema import day_frame, history_frame, memory_report, to_display
+from store import EnergyStore
+from tolerance import daily_sensitivity
+
+COFFEE_SCHEDULE = {"7:30": DEFAULT_DOSE_MG, "14:00": DEFAULT_DOSE_MG}
+DECAF_DOSE_MG = 3.0  # a cup of decaf still carries a few mg
+SCENARIOS = {
+    "1 cup": {"7:30": DEFAULT_DOSE_MG},
+    "2 cups": COFFEE_SCHEDULE,
+    "3 cups": {"7:30": DEFAULT_DOSE_MG, "11:00": DEFAULT_DOSE_MG, "14:00": DEFAULT_DOSE_MG},
+    "Decaf switch": {"7:30": DEFAULT_DOSE_MG, "14:00": DECAF_DOSE_MG},
+}
+SCENARIO_WORKERS = min(4, os.cpu_count() or 1)  # a single core runs the scenarios in-process
+_SCENARIO_POOL = None
+POPULATION_SIZE = 100_000
+HISTORY_DAYS = 365
+HISTORY_USER = os.environ.get("COFFEE_USER")  # chart this user's stored logs when set
+INTAKE_USER = DEFAULT_USER
+PRODUCTIVITY_THRESHOLD = 60
+CURVE_RESOLUTION = 1  # minutes between points of the interpolated curve
+
+CACHE_SIZE = 32
+CACHE_TTL = 3600.0  # seconds
+
+
+# -----------------------------
+# Logged intake - the day's schedule comes from the SQLite event store
+# -----------------------------
+def logged_schedule(user: str = INTAKE_USER, day=None, store: IntakeStore | None = None,
+                    default: bool = True) -> dict:
+    """The day's logged drinks as ``{clock: dose_mg}``; with ``default``, an empty day shows ``COFFEE_SCHEDULE``."""
+    return (store or IntakeStore()).day_schedule(user, day, COFFEE_SCHEDULE if default else None)
+
+
+def daily_params(user: str = INTAKE_USER, day=None, store: IntakeStore | None = None) -> ModelParams:
+    """Model parameters for the day, with caffeine sensitivity scaled by the tolerance carried over from past days."""
+    factor = daily_sensitivity(user, day, store)
+    if factor == 1.0:
+        return DEFAULT_PARAMS
+    return DEFAULT_PARAMS.with_updates(sensitivity=DEFAULT_PARAMS.sensitivity * factor)
+
+
+# -----------------------------
+# Data Generator - 2 coffees at 7:30 and 14:00, computed by the caffeine model
+# -----------------------------
+@memoize(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+def generate_energy_data(
+    schedule: dict = COFFEE_SCHEDULE,
+    start: str = "6:00",
+    end: str = "22:00",
+    step: int = 30,
+    params: ModelParams = DEFAULT_PARAMS,
+) -> pd.DataFrame:
+    minutes = minutes_grid(start, end, step)
+    dose_times = [parse_clock(h) for h in schedule]
+    energy = energy_curve(minutes, dose_times, list(schedule.values()), params)
+
+    # Minimal markers - only the coffee moments that fall on the time grid
+    return day_frame(minutes, energy, coffee=np.isin(minutes, dose_times))
+
+
+@memoize(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+def population_band_data(schedule: dict = COFFEE_SCHEDULE, n: int = POPULATION_SIZE) -> np.ndarray:
+    return population_bands(
+        minutes_grid(),
+        [parse_clock(h) for h in schedule],
+        list(schedule.values()),
+        n=n,
+    )
+
+
+# -----------------------------
+# Interpolated curve - monotone cubic through the samples, per (dataset, resolution)
+# -----------------------------
+@memoize(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+def interpolated_energy(
+    schedule: dict = COFFEE_SCHEDULE,
+    resolution: int = CURVE_RESOLUTION,
+    params: ModelParams = DEFAULT_PARAMS,
+) -> tuple:
+    """``(minutes, energy)`` of the day curve at ``resolution`` minutes, float32 energy."""
+    df = generate_energy_data(schedule, params=params)
+    minutes = np.arange(df["Minute"].iloc[0], df["Minute"].iloc[-1] + 1, resolution, dtype=np.float64)
+    return minutes, pchip(df["Minute"], df["Energy"], minutes).astype(np.float32)
+
+
+@memoize(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+def interpolated_bands(
+    schedule: dict = COFFEE_SCHEDULE,
+    n: int = POPULATION_SIZE,
+    resolution: int = CURVE_RESOLUTION,
+) -> np.ndarray:
+    minutes, _ = interpolated_energy(schedule, resolution)
+    return pchip(minutes_grid(), population_band_data(schedule, n), minutes).astype(np.float32)
+
+
+# -----------------------------
+# History - one simulated day per calendar day, minute resolution
+# -----------------------------
+@memoize(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+def energy_history(
+    days: int = HISTORY_DAYS,
+    last_day: str | None = None,
+    schedule: dict = COFFEE_SCHEDULE,
+    seed: int = 0,
+) -> pd.DataFrame:
+    last_day = np.datetime64(last_day or "today", "D")
+    dates = np.arange(last_day - days + 1, last_day + 1)
+    minutes = minutes_grid(step=1)
+
+    # Real days drift around the planned schedule by a few minutes
+    rng = np.random.default_rng(seed)
+    planned = np.array([parse_clock(h) for h in schedule], dtype=np.float64)
+    dose_times = planned + rng.normal(0.0, 20.0, (days, len(planned)))
+    energy = energy_curve(minutes, dose_times, list(schedule.values()))
+
+    times = dates[:, None].astype("datetime64[m]") + minutes.astype("timedelta64[m]")
+    return history_frame(times.ravel(), energy.ravel())
+
+
+def history_version(user: str | None = None) -> tuple:
+    """Cache key part for ``user``'s stored logs, changing with every append; empty for the simulation.
+
+    Every history step takes it as ``version``, so appended days show up in
+    all of them on the next rerun rather than when their caches expire.
+    """
+    return EnergyStore().version(user) if user else ()
+
+
+@memoize(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+def stored_history(user: str, days: int = HISTORY_DAYS, last_day: str | None = None,
+                   version: tuple = ()) -> pd.DataFrame:
+    return EnergyStore().load(user, days, last_day)
+
+
+def history_source(days: int = HISTORY_DAYS, last_day: str | None = None, user: str | None = None,
+                   version: tuple = ()) -> pd.DataFrame:
+    # Stored logs when the user has any, the simulated history otherwise
+    history = stored_history(user, days, last_day, version) if user else None
+    if history is None or history.empty:
+        history = energy_history(days, last_day)
+    return history
+
+
+@memoize(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+def energy_pyramid(days: int = HISTORY_DAYS, last_day: str | None = None, user: str | None = None,
+                   version: tuple = ()) -> EnergyPyramid:
+    history = history_source(days, last_day, user, version)
+    return EnergyPyramid.build(history["Time"], history["Energy"])
+
+
+@memoize(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+def history_figure(start, end, days: int = HISTORY_DAYS, last_day: str | None = None, user: str | None = None,
+                   version: tuple = ()):
+    tier, rows = energy_pyramid(days, last_day, user, version).window(start, end)
+    return tier, build_history_figure(rows, tier)
+
+
+# -----------------------------
+# Energy calendar - day x time-of-day matrix and small multiples, aggregated once
+# -----------------------------
+@memoize(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+def history_calendar(days: int = HISTORY_DAYS, last_day: str | None = None, user: str | None = None,
+                     version: tuple = (), slot_minutes: int = SLOT_MINUTES) -> tuple:
+    """``(dates, slot_starts, means)`` of the history, see ``daymatrix.day_matrix``."""
+    history = history_source(days, last_day, user, version)
+    return day_matrix(history["Time"].to_numpy(), history["Energy"].to_numpy(), slot_minutes)
+
+
+@memoize(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+def calendar_figure(days: int = HISTORY_DAYS, last_day: str | None = None, user: str | None = None,
+                    version: tuple = ()):
+    return build_heatmap_figure(*history_calendar(days, last_day, user, version))
+
+
+@memoize(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+def small_multiples_figure(selected: tuple, days: int = HISTORY_DAYS, last_day: str | None = None,
+                           user: str | None = None, version: tuple = ()):
+    history = history_source(days, last_day, user, version)
+    x, y, offsets, span = day_panels(history["Time"].to_numpy(), history["Energy"].to_numpy(), selected)
+    labels = [str(day) for day in np.unique(np.asarray(selected, dtype="datetime64[D]"))]
+    return build_small_multiples_figure(x, y, offsets, span, labels)
+
+
+# -----------------------------
+# Figure
+# -----------------------------
+@memoize(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+def energy_figure(
+    schedule: dict = COFFEE_SCHEDULE,
+    population: int = POPULATION_SIZE,
+    resolution: int = CURVE_RESOLUTION,
+    params: ModelParams = DEFAULT_PARAMS,
+):
+    # Samples as markers; line, hover, bands and stars all follow the interpolated curve
+    df = generate_energy_data(schedule, params=params)
+    curve = interpolated_energy(schedule, resolution, params)
+    events = join_energy(intake_events(schedule), *curve)
+    bands = interpolated_bands(schedule, population, resolution) if population else None
+    return build_energy_figure(df, events, bands, curve)
+
+
+# -----------------------------
+# Metrics
+# -----------------------------
+@memoize(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+def energy_metrics(
+    schedule: dict = COFFEE_SCHEDULE,
+    threshold: float = PRODUCTIVITY_THRESHOLD,
+    resolution: int = CURVE_RESOLUTION,
+    params: ModelParams = DEFAULT_PARAMS,
+) -> dict:
+    minutes, energy = interpolated_energy(schedule, resolution, params)
+    stats = EnergyStats(threshold=threshold)
+    for clock in schedule:
+        stats.add_coffee(parse_clock(clock))
+    stats.update(minutes, energy)
+    times, directions = threshold_crossings(minutes, energy, threshold)
+    return {
+        "peak": int(stats.peak),
+        "average": round(stats.mean, 1),
+        "std": round(stats.std, 1),
+        "hours_above": stats.minutes_above / 60,
+        "threshold": threshold,
+        "sensitivity": float(params.sensitivity),
+        "boosts": stats.boosts,
+        "cups": len(schedule),
+        "times": " & ".join(schedule),
+        "crossings": [(format_clock(t), int(d)) for t, d in zip(times, directions)],
+    }
+
+
+@memoize(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+def history_stats(
+    days: int = HISTORY_DAYS,
+    last_day: str | None = None,
+    user: str | None = None,
+    threshold: float = PRODUCTIVITY_THRESHOLD,
+    version: tuple = (),
+) -> tuple:
+    """``(EnergyStats, days)`` over the history, built as one merged partial aggregate per day."""
+    history = history_source(days, last_day, user, version)
+    times, energy = history["Time"].to_numpy(), history["Energy"].to_numpy()
+    day = times.astype("datetime64[D]").astype(np.int64)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(day)) + 1, [len(day)]))
+    total = EnergyStats(threshold=threshold)
+    for lo, hi in zip(starts[:-1], starts[1:]):
+        total = total.merge(EnergyStats(threshold=threshold).update(times[lo:hi], energy[lo:hi]))
+    return total, len(starts) - 1
+
+
+@memoize(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+def best_schedule(threshold: float = PRODUCTIVITY_THRESHOLD, params: ModelParams = DEFAULT_PARAMS):
+    # Independent of anyone's logged cups, so one search serves every schedule
+    return optimize_schedule(top=1, threshold=threshold, params=params)[0]
+
+
+@memoize(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+def schedule_comparison(
+    schedule: dict = COFFEE_SCHEDULE,
+    threshold: float = PRODUCTIVITY_THRESHOLD,
+    params: ModelParams = DEFAULT_PARAMS,
+):
+    """The best schedule and the current schedule's minutes above ``threshold``.
+
+    Both rows are measured on the dashboard's curve, so they match the stat cards.
+    """
+    best = best_schedule(threshold, params)
+    best_cups = {format_clock(t): d for t, d in zip(best.times, best.doses)}
+    best_above = energy_metrics(best_cups, threshold, params=params)["hours_above"] * 60
+    current_above = energy_metrics(schedule, threshold, params=params)["hours_above"] * 60
+    return replace(best, minutes_above=best_above), current_above
+
+
+def _scenario(index: int, name: str, schedule: dict, threshold: float, resolution: int, params: ModelParams) -> tuple:
+    minutes, energy = interpolated_energy(schedule, resolution, params)
+    return scenario_trace(name, minutes, energy, index), energy_metrics(schedule, threshold, resolution, params)
+
+
+def _scenario_pool() -> ProcessPoolExecutor:
+    # One pool per server process, so reruns don't pay for starting workers
+    global _SCENARIO_POOL
+    if _SCENARIO_POOL is None:
+        _SCENARIO_POOL = ProcessPoolExecutor(max_workers=SCENARIO_WORKERS)
+    return _SCENARIO_POOL
+
+
+@memoize(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+def scenario_comparison(
+    scenarios: dict = SCENARIOS,
+    threshold: float = PRODUCTIVITY_THRESHOLD,
+    resolution: int = CURVE_RESOLUTION,
+    params: ModelParams = DEFAULT_PARAMS,
+) -> tuple:
+    """``(figure, table)`` comparing the named schedules, one worker process per scenario."""
+    # Curves, metrics and traces are pandas, plotly validation and small-array
+    # NumPy, which hold the GIL, so the scenarios run in processes, not threads
+    tasks = (range(len(scenarios)), scenarios, scenarios.values(),
+             repeat(threshold), repeat(resolution), repeat(params))
+    runner = _scenario_pool().map if SCENARIO_WORKERS > 1 else map
+    results = dict(zip(scenarios, runner(_scenario, *tasks)))
+
+    fig = build_scenario_figure([trace for trace, _ in results.values()], threshold)
+    table = pd.DataFrame([
+        {
+            "Scenario": name,
+            "Cups": metrics["times"],
+            "Caffeine (mg)": round(sum(scenarios[name].values())),
+            "Peak (%)": metrics["peak"],
+            "Average (%)": metrics["average"],
+            f"Hours ≥ {threshold}%": round(metrics["hours_above"], 1),
+        }
+        for name, (_, metrics) in results.items()
+    ]).set_index("Scenario")
+    return fig, table
+
+
+@memoize(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+def history_memory_report(days: int = HISTORY_DAYS) -> pd.DataFrame:
+    history = energy_history(days)
+    return memory_report(legacy=to_display(history), compact=history)
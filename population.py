@@ -0,0 +1,85 @@
+"""Monte Carlo population of virtual coffee drinkers.
+
+People are sampled in chunks and each chunk is simulated as one batched
+``energy_curve`` call.  Chunks are reduced to per-time-step histograms of the
+energy level, which are cheap to merge, so the work can be sharded across a
+process pool and the percentile bands are read off the merged histogram.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from energy_model import DEFAULT_PARAMS, ModelParams, energy_curve
+
+HISTOGRAM_BINS = 1001  # 0.1 percentage-point resolution over 0-100 %
+DEFAULT_PERCENTILES = (10, 50, 90)
+
+
+# -----------------------------
+# Sampling
+# -----------------------------
+def sample_people(n: int, rng: np.random.Generator, params: ModelParams = DEFAULT_PARAMS) -> ModelParams:
+    # Chronotype moves the whole sleep-wake and circadian baseline, the coffee clock times stay fixed
+    wake_shift = rng.normal(0.0, 45.0, n)
+    return params.with_updates(
+        half_life=params.half_life * rng.lognormal(0.0, 0.35, n),
+        sensitivity=params.sensitivity * rng.lognormal(0.0, 0.2, n),
+        acute_tolerance=np.clip(params.acute_tolerance + rng.normal(0.0, 0.1, n), 0.0, 0.9),
+        chronotype_shift=params.chronotype_shift + wake_shift,
+    )
+
+
+def _simulate_chunk(minutes, dose_times, doses, n, seed, params) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    energy = energy_curve(minutes, dose_times, doses, sample_people(n, rng, params))
+    bins = np.rint(energy * ((HISTOGRAM_BINS - 1) / 100.0)).astype(np.int64)
+    flat = bins + np.arange(len(minutes)) * HISTOGRAM_BINS
+    counts = np.bincount(flat.ravel(), minlength=len(minutes) * HISTOGRAM_BINS)
+    return counts.reshape(len(minutes), HISTOGRAM_BINS)
+
+
+# -----------------------------
+# Simulation
+# -----------------------------
+def population_histogram(
+    minutes,
+    dose_times,
+    doses,
+    n: int = 100_000,
+    seed: int = 0,
+    chunk_size: int = 10_000,
+    workers: int | None = None,
+    params: ModelParams = DEFAULT_PARAMS,
+) -> np.ndarray:
+    """Counts of shape ``(len(minutes), HISTOGRAM_BINS)`` over ``n`` simulated people.
+
+    ``workers=None`` runs in-process; ``workers=0`` uses every core.
+    """
+    minutes = np.asarray(minutes, dtype=np.float64)
+    sizes = [chunk_size] * (n // chunk_size) + ([n % chunk_size] if n % chunk_size else [])
+    # Per-chunk seeds keep the result identical however the chunks are sharded
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(minutes, dose_times, doses, size, s, params) for size, s in zip(sizes, seeds)]
+
+    if workers is None:
+        parts = (_simulate_chunk(*job) for job in jobs)
+        return sum(parts, np.zeros((len(minutes), HISTOGRAM_BINS), dtype=np.int64))
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        parts = pool.map(_simulate_chunk, *zip(*jobs))
+        return sum(parts, np.zeros((len(minutes), HISTOGRAM_BINS), dtype=np.int64))
+
+
+def histogram_percentiles(counts, percentiles=DEFAULT_PERCENTILES) -> np.ndarray:
+    cumulative = np.cumsum(counts, axis=-1)
+    targets = np.asarray(percentiles, dtype=np.float64)[:, None] / 100.0 * cumulative[:, -1]
+    # First bin whose cumulative count reaches each target, per time step
+    index = (cumulative[None, :, :] < targets[:, :, None]).sum(axis=-1)
+    return index * (100.0 / (HISTOGRAM_BINS - 1))
+
+
+def population_bands(minutes, dose_times, doses, percentiles=DEFAULT_PERCENTILES, **kwargs) -> np.ndarray:
+    """Energy percentiles of shape ``(len(percentiles), len(minutes))``."""
+    return histogram_percentiles(population_histogram(minutes, dose_times, doses, **kwargs), percentiles)
@@ -0,0 +1,147 @@
+"""Opt-in per-section instrumentation for page reruns.
+
+The page calls ``profiler.mark(name)`` under each section banner; a mark
+closes the previous section and opens the next one.  For every section the
+profiler records wall time, allocations (tracemalloc current delta and peak)
+and the payload bytes the section sent to the browser.  ``finish()`` appends
+the rerun to a JSON lines file and rewrites a Prometheus text file.
+
+Disabled profilers do nothing but return.  tracemalloc is process-wide, so
+only one rerun at a time traces memory: it starts tracing and stops it again
+in ``finish()``; reruns that overlap it record time and payload only.  The
+JSON lines log is rotated once it reaches ``MAX_LOG_BYTES``.
+"""
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+PROFILE_DIR = os.environ.get("COFFEE_PROFILE_DIR", ".")
+JSONL_NAME = "profile.jsonl"
+PROMETHEUS_NAME = "profile.prom"
+MAX_LOG_BYTES = 5_000_000  # profile.jsonl moves to profile.jsonl.1 past this size
+TRACE_TIMEOUT = 120.0  # seconds before a rerun that never finished loses tracemalloc
+
+_trace_lock = threading.Lock()
+_trace_owner = None  # (run id, claimed at) of the rerun tracing memory
+_started_here = False  # tracemalloc was started by a profiler, not by the interpreter
+
+
+def _claim_tracing(run_id: str) -> bool:
+    global _trace_owner
+    with _trace_lock:
+        now = time.monotonic()
+        if _trace_owner is not None and now - _trace_owner[1] < TRACE_TIMEOUT:
+            return False
+        _trace_owner = (run_id, now)
+        return True
+
+
+def _release_tracing(run_id: str) -> None:
+    # The owner stops tracing again, so unprofiled reruns never pay for it
+    global _trace_owner, _started_here
+    with _trace_lock:
+        if _trace_owner is not None and _trace_owner[0] == run_id:
+            _trace_owner = None
+            if _started_here:
+                tracemalloc.stop()
+                _started_here = False
+
+
+class Profiler:
+    def __init__(self, enabled: bool = False, out_dir=PROFILE_DIR):
+        self.enabled = enabled
+        self.out_dir = Path(out_dir)
+        self.run_id = uuid.uuid4().hex[:12]
+        self.sections = []
+        self._current = None
+        self.tracing = enabled and _claim_tracing(self.run_id)
+        if self.tracing and not tracemalloc.is_tracing():
+            global _started_here
+            _started_here = True
+            tracemalloc.start()
+
+    # -----------------------------
+    # Recording
+    # -----------------------------
+    def mark(self, name: str) -> None:
+        if not self.enabled:
+            return
+        self._close()
+        if self.tracing:
+            tracemalloc.reset_peak()
+        self._current = {
+            "section": name,
+            "started": time.perf_counter(),
+            "memory": tracemalloc.get_traced_memory()[0] if self.tracing else None,
+            "payload_bytes": 0,
+        }
+
+    def payload(self, size: int) -> None:
+        if self.enabled and self._current is not None:
+            self._current["payload_bytes"] += size
+
+    def payload_text(self, text: str) -> None:
+        if self.enabled:
+            self.payload(len(text.encode("utf-8")))
+
+    def payload_figure(self, fig) -> None:
+        # Only serialized when profiling, to measure what st.plotly_chart ships
+        if self.enabled:
+            text = json.dumps(fig) if isinstance(fig, dict) else fig.to_json()
+            self.payload(len(text.encode("utf-8")))
+
+    def _close(self) -> None:
+        if self._current is None:
+            return
+        section = self._current
+        alloc = peak = None
+        if self.tracing:
+            current, traced_peak = tracemalloc.get_traced_memory()
+            alloc, peak = current - section["memory"], max(traced_peak - section["memory"], 0)
+        self.sections.append({
+            "section": section["section"],
+            "wall_ms": (time.perf_counter() - section["started"]) * 1000,
+            "alloc_bytes": alloc,
+            "peak_bytes": peak,
+            "payload_bytes": section["payload_bytes"],
+        })
+        self._current = None
+
+    # -----------------------------
+    # Export
+    # -----------------------------
+    def finish(self) -> list:
+        if not self.enabled:
+            return []
+        self._close()
+        if self.tracing:
+            _release_tracing(self.run_id)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.time()
+        log = self.out_dir / JSONL_NAME
+        if log.exists() and log.stat().st_size >= MAX_LOG_BYTES:
+            os.replace(log, log.with_name(JSONL_NAME + ".1"))
+        with open(log, "a", encoding="utf-8") as f:
+            for section in self.sections:
+                f.write(json.dumps({"run": self.run_id, "time": stamp, **section}) + "\n")
+        (self.out_dir / PROMETHEUS_NAME).write_text(self.prometheus(), encoding="utf-8")
+        return self.sections
+
+    def prometheus(self) -> str:
+        metrics = (
+            ("coffee_section_seconds", "wall_ms", 1e-3, "Wall time of each page section in the last rerun"),
+            ("coffee_section_alloc_bytes", "alloc_bytes", 1, "Net bytes allocated by each page section"),
+            ("coffee_section_peak_bytes", "peak_bytes", 1, "Peak traced memory above the section start"),
+            ("coffee_section_payload_bytes", "payload_bytes", 1, "Bytes each page section sent to the browser"),
+        )
+        lines = []
+        for name, key, scale, help_text in metrics:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            lines += [f'{name}{{section="{s["section"]}"}} {s[key] * scale:g}'
+                      for s in self.sections if s[key] is not None]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,74 @@
+"""Multi-resolution min/max/mean tiers for long energy histories.
+
+The 1-minute tier is aggregated from the raw samples and every coarser tier
+from the one below it, so building the pyramid is a handful of ``reduceat``
+passes.  ``EnergyPyramid.window`` picks the finest tier that fits a visible
+time range into a fixed point budget, which keeps the chart payload roughly
+constant however much history exists.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+TIERS = {
+    "1 min": np.timedelta64(1, "m"),
+    "5 min": np.timedelta64(5, "m"),
+    "30 min": np.timedelta64(30, "m"),
+    "1 day": np.timedelta64(1, "D"),
+}
+DEFAULT_MAX_POINTS = 2000
+
+
+def _aggregate(times, lows, highs, sums, counts, width) -> pd.DataFrame:
+    # Samples are time-sorted, so each bin is a contiguous run starting at a boundary
+    bins = times.astype("datetime64[m]").astype(np.int64) // (width // np.timedelta64(1, "m"))
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(bins)) + 1))
+    total = np.add.reduceat(sums, starts)
+    count = np.add.reduceat(counts, starts)
+    return pd.DataFrame({
+        "Time": (bins[starts] * (width // np.timedelta64(1, "m"))).astype("datetime64[m]"),
+        "Min": np.minimum.reduceat(lows, starts),
+        "Max": np.maximum.reduceat(highs, starts),
+        "Mean": total / count,
+        "Count": count,
+    })
+
+
+@dataclass(frozen=True)
+class EnergyPyramid:
+    tiers: dict
+
+    @classmethod
+    def build(cls, times, energy) -> "EnergyPyramid":
+        times = np.asarray(times, dtype="datetime64[s]")
+        energy = np.asarray(energy, dtype=np.float64)
+        order = np.argsort(times, kind="stable")
+        times, energy = times[order], energy[order]
+
+        tiers = {}
+        lows = highs = sums = energy
+        counts = np.ones(len(energy), dtype=np.int64)
+        for name, width in TIERS.items():
+            tier = _aggregate(times, lows, highs, sums, counts, width)
+            tiers[name] = tier
+            times = tier["Time"].to_numpy()
+            lows, highs = tier["Min"].to_numpy(), tier["Max"].to_numpy()
+            sums, counts = (tier["Mean"] * tier["Count"]).to_numpy(), tier["Count"].to_numpy()
+        return cls(tiers)
+
+    @property
+    def span(self) -> tuple:
+        finest = self.tiers[next(iter(TIERS))]["Time"]
+        return finest.iloc[0], finest.iloc[-1]
+
+    def window(self, start, end, max_points: int = DEFAULT_MAX_POINTS) -> tuple:
+        """``(tier name, rows)`` of the finest tier with at most ``max_points`` rows in ``[start, end]``."""
+        start, end = np.datetime64(start, "m"), np.datetime64(end, "m")
+        for name, tier in self.tiers.items():
+            times = tier["Time"].to_numpy()
+            lo = np.searchsorted(times, start, side="left")
+            hi = np.searchsorted(times, end, side="right")
+            if hi - lo <= max_points or name == next(reversed(TIERS)):
+                return name, tier.iloc[lo:hi]
@@ -0,0 +1,186 @@
+"""Render standalone HTML energy-curve reports for many users without Streamlit.
+
+Each report holds the Daily Energy Curve figure, the key metrics and the
+schedule insights, built by the same cached ``pipeline`` functions the page
+uses.  Users are fanned out over a process pool, every worker writes its
+report straight to disk, and the run ends with a throughput summary::
+
+    python render_reports.py --users 5000 --out reports --workers 0
+    python render_reports.py --users-file users.txt --db coffee_events.db --day 2026-10-18
+"""
+
+import argparse
+import html
+import os
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+from energy_model import DEFAULT_PARAMS, ModelParams, format_clock, parse_clock
+from intake_store import IntakeStore
+from pipeline import (
+    COFFEE_SCHEDULE,
+    CURVE_RESOLUTION,
+    PRODUCTIVITY_THRESHOLD,
+    daily_params,
+    energy_figure,
+    energy_metrics,
+    logged_schedule,
+    schedule_comparison,
+)
+
+PLOTLY_JS_NAME = "plotly.min.js"
+
+REPORT_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Daily Energy Curve - {user}</title>
+<style>
+body {{ background: #1a0d08; color: #f4e4c1; font-family: 'Poppins', sans-serif; max-width: 1200px; margin: 2rem auto; }}
+h1, h2 {{ color: #d4a574; }}
+.metrics {{ display: flex; gap: 1rem; }}
+.metric {{ flex: 1; border: 1px solid rgba(212, 165, 116, 0.3); border-radius: 16px; padding: 1rem; text-align: center; }}
+.metric b {{ display: block; font-size: 1.8rem; }}
+</style>
+</head>
+<body>
+<h1>☕ Daily Energy Curve - {user} - {day}</h1>
+{figure}
+<h2>📊 Key Performance Metrics</h2>
+<div class="metrics">
+<div class="metric">🔝 Peak Energy<b>{peak}%</b></div>
+<div class="metric">⚡ Average<b>{average}%</b></div>
+<div class="metric">☕ Daily Coffees<b>{cups}</b></div>
+<div class="metric">⏰ Coffee Times<b>{times}</b></div>
+</div>
+<h2>🎯 Key Insights</h2>
+<ul>
+<li>{hours_above:.1f} h at or above {threshold}% energy.</li>
+<li>Coffee boosts: {boosts}.</li>
+<li>Best schedule found: {best} - {best_hours:.1f} h at or above {threshold}%.</li>
+</ul>
+</body>
+</html>
+"""
+
+
+# -----------------------------
+# Per-user schedules
+# -----------------------------
+def demo_schedule(user: str) -> dict:
+    # Deterministic per-user variation of the default schedule, for runs without a database
+    rng = np.random.default_rng(zlib.crc32(user.encode()))
+    return {
+        format_clock(parse_clock(h) + 15 * rng.integers(-4, 5)): float(rng.choice([63.0, 95.0, 150.0]))
+        for h in COFFEE_SCHEDULE
+    }
+
+
+def user_schedule(user: str, day, db) -> dict:
+    if db is None:
+        return demo_schedule(user)
+    return logged_schedule(user, day, IntakeStore(db), default=False) or COFFEE_SCHEDULE
+
+
+def user_params(user: str, day, db) -> ModelParams:
+    # The page's tolerance-scaled parameters, read from the same database as the schedule
+    if db is None:
+        return DEFAULT_PARAMS
+    return daily_params(user, day, IntakeStore(db))
+
+
+# -----------------------------
+# Rendering
+# -----------------------------
+def render_report(user: str, day: str, out_dir: str, db, population: int, plotlyjs) -> tuple:
+    started = time.perf_counter()
+    schedule = user_schedule(user, day, db)
+    params = user_params(user, day, db)
+    metrics = energy_metrics(schedule, params=params)
+    # Counted from the log as on the page, two drinks in one minute are still two cups
+    cups = (IntakeStore(db).day_count(user, day) if db is not None else 0) or metrics["cups"]
+    best, current_above = schedule_comparison(schedule, PRODUCTIVITY_THRESHOLD, params)
+
+    fig = energy_figure(schedule, population, CURVE_RESOLUTION, params)
+    figure = pio.to_html(fig, full_html=False, include_plotlyjs=plotlyjs)
+    page = REPORT_TEMPLATE.format(
+        user=html.escape(user),
+        day=day,
+        figure=figure,
+        peak=metrics["peak"],
+        average=metrics["average"],
+        cups=cups,
+        times=metrics["times"],
+        hours_above=metrics["hours_above"],
+        threshold=PRODUCTIVITY_THRESHOLD,
+        boosts=", ".join(f"+{b:.0f}%" for b in metrics["boosts"]) or "none measured",
+        best=best.label,
+        best_hours=best.minutes_above / 60,
+    )
+
+    path = Path(out_dir) / f"{''.join(c if c.isalnum() or c in '-_.' else '_' for c in user)}.html"
+    path.write_text(page, encoding="utf-8")
+    return user, len(page.encode("utf-8")), time.perf_counter() - started
+
+
+def _render_job(job) -> tuple:
+    return render_report(*job)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    users = parser.add_mutually_exclusive_group(required=True)
+    users.add_argument("--users", type=int, help="render reports for user-00000 .. user-N")
+    users.add_argument("--users-file", help="file with one user id per line")
+    parser.add_argument("--out", default="reports", help="output directory (default: reports)")
+    parser.add_argument("--day", default=str(np.datetime64("today", "D")), help="day to report (YYYY-MM-DD)")
+    parser.add_argument("--db", help="intake SQLite database; per-user demo schedules when omitted")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes, 0 for every core (default: 0)")
+    parser.add_argument("--population", type=int, default=0, help="population band size per report (default: 0, no band)")
+    parser.add_argument(
+        "--plotlyjs", choices=("cdn", "directory", "inline"), default="directory",
+        help="where reports load plotly.js from (default: one shared copy in --out)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.users is not None:
+        users = [f"user-{i:05d}" for i in range(args.users)]
+    else:
+        users = [line.strip() for line in Path(args.users_file).read_text().splitlines() if line.strip()]
+
+    os.makedirs(args.out, exist_ok=True)
+    plotlyjs = {"cdn": "cdn", "inline": True, "directory": PLOTLY_JS_NAME}[args.plotlyjs]
+    if args.plotlyjs == "directory":
+        # One shared copy next to the reports instead of 3.5 MB inlined into each of them
+        Path(args.out, PLOTLY_JS_NAME).write_text(get_plotlyjs(), encoding="utf-8")
+
+    jobs = [(user, args.day, args.out, args.db, args.population, plotlyjs) for user in users]
+    started = time.perf_counter()
+    written = 0
+    with ProcessPoolExecutor(max_workers=args.workers or os.cpu_count()) as pool:
+        # Results stream back in order as workers finish writing their files
+        for done, (user, size, seconds) in enumerate(pool.map(_render_job, jobs, chunksize=16), start=1):
+            written += size
+            if done % 500 == 0 or done == len(jobs):
+                elapsed = time.perf_counter() - started
+                print(f"{done}/{len(jobs)} reports, {done / elapsed:.1f} reports/s, "
+                      f"{written / elapsed / 1e6:.1f} MB/s", file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    print(f"Rendered {len(jobs)} reports ({written / 1e6:.1f} MB) to {args.out} in {elapsed:.1f} s "
+          f"({len(jobs) / elapsed:.1f} reports/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Compact in-memory schema for energy series.
+
+Day curves are stored as ``Minute`` (int16 minute of day), ``Energy`` (uint8
+percent) and a sparse boolean ``Coffee`` flag; multi-day histories as
+``Time`` (datetime64[s]) and ``Energy`` (uint8).  The chart and metrics read
+these columns directly; ``to_display`` rebuilds the old string-based layout
+only for export and for the memory report.
+"""
+
+import numpy as np
+import pandas as pd
+
+from energy_model import format_clock
+
+MINUTE_DTYPE = np.int16
+ENERGY_DTYPE = np.uint8
+FLAG_DTYPE = pd.SparseDtype(bool, fill_value=False)
+
+
+def compact_energy(energy) -> np.ndarray:
+    return np.clip(np.rint(np.asarray(energy, dtype=np.float64)), 0, 100).astype(ENERGY_DTYPE)
+
+
+def day_frame(minutes, energy, coffee=None) -> pd.DataFrame:
+    minutes = np.asarray(minutes)
+    flags = np.zeros(len(minutes), dtype=bool) if coffee is None else np.asarray(coffee, dtype=bool)
+    return pd.DataFrame({
+        "Minute": minutes.astype(MINUTE_DTYPE),
+        "Energy": compact_energy(energy),
+        "Coffee": pd.arrays.SparseArray(flags, dtype=FLAG_DTYPE),
+    })
+
+
+def history_frame(times, energy) -> pd.DataFrame:
+    return pd.DataFrame({
+        "Time": np.asarray(times).astype("datetime64[s]"),
+        "Energy": compact_energy(energy),
+    })
+
+
+# -----------------------------
+# Conversion helpers
+# -----------------------------
+def to_display(df: pd.DataFrame) -> pd.DataFrame:
+    """Legacy layout: ``Hour`` strings, int64 ``Energy`` and an object ``Mood`` column."""
+    minutes = df["Minute"] if "Minute" in df else (
+        df["Time"] - df["Time"].dt.normalize()
+    ).dt.total_seconds() // 60
+    coffee = df["Coffee"].to_numpy(dtype=bool) if "Coffee" in df else np.zeros(len(df), dtype=bool)
+    return pd.DataFrame({
+        "Hour": [format_clock(m) for m in minutes],
+        "Energy": df["Energy"].astype(np.int64),
+        "Mood": np.where(coffee, "☕", "").astype(object),
+    })
+
+
+def from_display(df: pd.DataFrame) -> pd.DataFrame:
+    hours = df["Hour"].str.split(":", expand=True).astype(int)
+    return day_frame(hours[0] * 60 + hours[1], df["Energy"], df["Mood"] == "☕")
+
+
+def memory_report(**frames) -> pd.DataFrame:
+    """Deep memory use per column for each named frame."""
+    rows = [
+        {"Frame": name, "Column": column, "Dtype": str(frame[column].dtype),
+         "Bytes": int(frame[column].memory_usage(index=False, deep=True))}
+        for name, frame in frames.items()
+        for column in frame.columns
+    ]
+    return pd.DataFrame(rows)
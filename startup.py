@@ -0,0 +1,142 @@
+"""Precomputed default view for a fast cold start.
+
+The page's default view, today's curve for the standard two-cup schedule,
+is the same for everyone, so it is built once at deploy time and stored as
+JSON: the serialized figure plus the stat-card metrics.  Loading it needs
+only the standard library, numpy and SQLite (to check today's logged cups),
+so the first render happens before pandas and the pipeline are imported::
+
+    python startup.py            # build artifacts/default_view.json and the image variants
+    python startup.py --measure  # import time and time to first render, both paths
+
+The artifact is keyed by a hash of the modules that shape the figure and the
+plotly version; a stale or mismatching artifact is ignored and the page falls
+back to computing the view.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from importlib.metadata import version
+from pathlib import Path
+
+from assets import build_images
+from intake_store import IntakeStore
+from tolerance import daily_sensitivity
+
+HERE = Path(__file__).parent
+ARTIFACT_PATH = Path(os.environ.get("COFFEE_ARTIFACT") or HERE / "artifacts" / "default_view.json")
+SOURCES = (
+    "energy_model.py", "population.py", "events.py", "schema.py", "interpolate.py",
+    "downsample.py", "chart.py", "metrics.py", "tolerance.py", "pipeline.py",
+)
+
+
+def artifact_key() -> str:
+    digest = hashlib.sha256(version("plotly").encode())
+    for name in SOURCES:
+        digest.update((HERE / name).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+# -----------------------------
+# Build and load
+# -----------------------------
+def build_artifact(path=ARTIFACT_PATH) -> Path:
+    from pipeline import COFFEE_SCHEDULE, POPULATION_SIZE, energy_figure, energy_metrics
+
+    metrics = energy_metrics(COFFEE_SCHEDULE)
+    view = {
+        "key": artifact_key(),
+        "schedule": COFFEE_SCHEDULE,
+        "population": POPULATION_SIZE,
+        "metrics": {**metrics, "boosts": [float(b) for b in metrics["boosts"]]},
+        "figure": json.loads(energy_figure(COFFEE_SCHEDULE, POPULATION_SIZE).to_json()),
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(view, separators=(",", ":")), encoding="utf-8")
+    return path
+
+
+def default_view(user: str, path=ARTIFACT_PATH, store: IntakeStore | None = None) -> dict | None:
+    """The precomputed view when it is current and today matches it (cups and tolerance), ``None`` otherwise."""
+    try:
+        view = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if view.get("key") != artifact_key():
+        return None
+    # Same fallback as pipeline.logged_schedule(), so an empty day shows the default cups
+    store = store or IntakeStore()
+    schedule = store.day_schedule(user, default=view["schedule"])
+    if schedule != view["schedule"] or daily_sensitivity(user, store=store) != view["metrics"]["sensitivity"]:
+        return None
+    return view
+
+
+# -----------------------------
+# Measurements - both paths are timed through st.plotly_chart, which imports
+# plotly and validates the figure
+# -----------------------------
+FAST_PATH = """
+import streamlit, startup, intake_store
+view = startup.default_view(intake_store.DEFAULT_USER)
+assert view is not None, "artifact missing or stale, run python startup.py first"
+streamlit.plotly_chart(view["figure"], use_container_width=True)
+"""
+
+SLOW_PATH = """
+import streamlit, pipeline
+schedule = pipeline.logged_schedule()
+pipeline.energy_metrics(schedule)
+streamlit.plotly_chart(pipeline.energy_figure(schedule, pipeline.POPULATION_SIZE), use_container_width=True)
+"""
+
+
+def time_fresh_process(code: str, repeat: int, env: dict) -> float:
+    # Each sample is a new interpreter, so module imports are paid every time
+    probe = f"import time\nstarted = time.perf_counter()\n{code}\nprint(time.perf_counter() - started)"
+    samples = [
+        float(subprocess.run(
+            [sys.executable, "-c", probe], capture_output=True, text=True, check=True, cwd=HERE, env=env
+        ).stdout)
+        for _ in range(repeat)
+    ]
+    return min(samples)
+
+
+def measure(path=ARTIFACT_PATH, repeat: int = 3) -> dict:
+    env = {**os.environ, "COFFEE_ARTIFACT": str(Path(path).resolve())}
+    results = {
+        "import_streamlit": time_fresh_process("import streamlit", repeat, env),
+        "import_fast_path": time_fresh_process("import streamlit, startup", repeat, env),
+        "import_pipeline": time_fresh_process("import streamlit, pipeline", repeat, env),
+        "first_render_precomputed": time_fresh_process(FAST_PATH, repeat, env),
+        "first_render_computed": time_fresh_process(SLOW_PATH, repeat, env),
+    }
+    for name, seconds in results.items():
+        print(f"{name:<26}{seconds * 1000:>9.0f} ms")
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=ARTIFACT_PATH, help=f"artifact file (default: {ARTIFACT_PATH})")
+    parser.add_argument("--measure", action="store_true", help="time imports and the first render of both paths")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh processes per measurement (default: 3)")
+    args = parser.parse_args(argv)
+
+    path = build_artifact(args.output)
+    print(f"Wrote {path} ({path.stat().st_size / 1e3:.0f} kB)")
+    print(f"Image variants: {', '.join(build_images())}")
+    if args.measure:
+        measure(path, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""Append-friendly columnar store for daily energy logs.
+
+Curves are written as uncompressed Arrow IPC files partitioned by user and
+day::
+
+    <root>/user=<id>/date=YYYY-MM-DD/part-<ns timestamp>-<random>.arrow
+
+Appending never rewrites existing files, it adds another part to the day
+under a name no other writer can pick, so concurrent appends never collide.
+Row order comes from the ``Time`` column, not from the part names.
+Loading a date range only lists the user's partition directories, picks the
+days in range by name and memory-maps those files, so reads are zero-copy
+and never parse unrelated history.
+"""
+
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from schema import history_frame
+
+DEFAULT_ROOT = os.environ.get("COFFEE_STORE", "energy_store")
+SCHEMA = pa.schema([("Time", pa.timestamp("s")), ("Energy", pa.uint8())])
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class EnergyStore:
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = Path(root)
+
+    def _user_dir(self, user: str) -> Path:
+        return self.root / f"user={_UNSAFE.sub('_', user)}"
+
+    # -----------------------------
+    # Writes
+    # -----------------------------
+    def append(self, user: str, frame: pd.DataFrame) -> int:
+        """Write ``frame`` (``Time``/``Energy``) as one new part per day; returns the parts written."""
+        frame = history_frame(frame["Time"], frame["Energy"]).sort_values("Time", kind="stable")
+        days = frame["Time"].to_numpy().astype("datetime64[D]")
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(days.astype(np.int64))) + 1, [len(days)]))
+
+        table = pa.Table.from_pandas(frame, schema=SCHEMA, preserve_index=False)
+        for lo, hi in zip(starts[:-1], starts[1:]):
+            day_dir = self._user_dir(user) / f"date={days[lo]}"
+            day_dir.mkdir(parents=True, exist_ok=True)
+            part = day_dir / f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:12]}.arrow"
+            # Write next to the target and rename, so readers never see half a file
+            tmp = day_dir / f".{part.stem}.tmp"
+            with pa.OSFile(str(tmp), "wb") as sink, ipc.new_file(sink, SCHEMA) as writer:
+                writer.write_table(table.slice(lo, hi - lo))
+            os.replace(tmp, part)
+        return len(starts) - 1
+
+    # -----------------------------
+    # Reads
+    # -----------------------------
+    def version(self, user: str) -> tuple:
+        """``(parts, latest mtime_ns)`` of the user's stored parts; changes with every append."""
+        parts = list(self._user_dir(user).glob("date=*/part-*.arrow"))
+        return len(parts), max((p.stat().st_mtime_ns for p in parts), default=0)
+
+    def days(self, user: str) -> list:
+        user_dir = self._user_dir(user)
+        if not user_dir.is_dir():
+            return []
+        return sorted(np.datetime64(p.name[len("date="):], "D") for p in user_dir.glob("date=*"))
+
+    def load(self, user: str, days: int = 90, last_day=None) -> pd.DataFrame:
+        """The user's ``days`` most recent days up to ``last_day`` (default: latest stored)."""
+        stored = self.days(user)
+        if not stored:
+            return history_frame(np.array([], dtype="datetime64[s]"), [])
+        last_day = np.datetime64(last_day, "D") if last_day is not None else stored[-1]
+        wanted = [d for d in stored if last_day - days < d <= last_day]
+
+        tables = []
+        for day in wanted:
+            for part in sorted((self._user_dir(user) / f"date={day}").glob("part-*.arrow")):
+                # The tables reference the mapped pages directly, so the map stays open with them
+                tables.append(ipc.open_file(pa.memory_map(str(part), "r")).read_all())
+        if not tables:
+            return history_frame(np.array([], dtype="datetime64[s]"), [])
+        return pa.concat_tables(tables).to_pandas().sort_values("Time", kind="stable", ignore_index=True)
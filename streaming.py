@@ -0,0 +1,161 @@
+"""Live energy sources and a bounded buffer for incremental chart updates.
+
+A source is polled on every refresh and returns only the samples that
+arrived since the previous poll: ``TailSource`` follows a growing JSONL/CSV
+file from its last byte offset, ``SocketSource`` drains a UDP socket that
+stands in for a wearable.  Malformed records are skipped and counted in the
+source's ``rejected``.  ``LiveSeries`` keeps the most recent samples in
+fixed-size arrays, so the cost of a tick depends on the new samples and the
+window size, never on how long the stream has been running.
+"""
+
+import json
+import os
+import socket
+import threading
+
+import numpy as np
+
+from metrics import EnergyStats
+
+DEFAULT_CAPACITY = 24 * 60  # one day of minute samples
+
+
+def parse_record(line: str):
+    """``(time, energy)`` of one JSONL or CSV line, ``None`` for blank lines and CSV headers.
+
+    Malformed lines raise ``ValueError``, ``KeyError`` or ``TypeError``.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith("{"):
+        record = json.loads(line)
+        stamp, value = record["time"], record["energy"]
+    else:
+        stamp, value = line.split(",")[:2]
+        if stamp.strip().lower() == "time":
+            return None  # CSV header
+    return np.datetime64(stamp.strip() if isinstance(stamp, str) else int(stamp), "s"), float(value)
+
+
+def parse_records(lines) -> tuple:
+    """``(times, energy, rejected)`` from JSONL (``{"time": ..., "energy": ...}``) or ``time,energy`` CSV lines.
+
+    Malformed lines are skipped and counted in ``rejected``, so one bad
+    record never costs the good ones around it.
+    """
+    times, energy, rejected = [], [], 0
+    for line in lines:
+        try:
+            record = parse_record(line)
+        except (ValueError, KeyError, TypeError):
+            rejected += 1
+            continue
+        if record is not None:
+            times.append(record[0])
+            energy.append(record[1])
+    return np.array(times, dtype="datetime64[s]"), np.array(energy, dtype=np.float32), rejected
+
+
+# -----------------------------
+# Sources
+# -----------------------------
+class TailSource:
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.rejected = 0
+
+    def poll(self) -> tuple:
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return parse_records([])[:2]
+        if size < self.offset:
+            # Truncated or rotated: start over from the top
+            self.offset = 0
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read()
+
+        # Only complete lines are consumed; an incomplete last line is read again next poll
+        complete = chunk[:chunk.rfind(b"\n") + 1]
+        times, energy, rejected = parse_records(complete.decode("utf-8", errors="replace").splitlines())
+        self.offset += len(complete)
+        self.rejected += rejected
+        return times, energy
+
+
+class SocketSource:
+    def __init__(self, host: str = "127.0.0.1", port: int = 9999):
+        self.rejected = 0
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.sock.setblocking(False)
+
+    def poll(self) -> tuple:
+        lines = []
+        while True:
+            try:
+                datagram = self.sock.recv(65536)
+            except BlockingIOError:
+                break
+            lines.extend(datagram.decode("utf-8", errors="replace").splitlines())
+        times, energy, rejected = parse_records(lines)
+        self.rejected += rejected
+        return times, energy
+
+    def close(self):
+        self.sock.close()
+
+
+def open_source(spec: str):
+    """``udp://host:port`` for a socket, anything else is a file path to tail."""
+    if spec.startswith("udp://"):
+        host, port = spec[len("udp://"):].rsplit(":", 1)
+        return SocketSource(host, int(port))
+    return TailSource(spec)
+
+
+# -----------------------------
+# Bounded live buffer
+# -----------------------------
+class LiveSeries:
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.times = np.empty(0, dtype="datetime64[s]")
+        self.energy = np.empty(0, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.energy)
+
+    def extend(self, times, energy) -> int:
+        """Append new samples, dropping the oldest past ``capacity``; returns how many were added."""
+        if len(energy) == 0:
+            return 0
+        self.times = np.concatenate((self.times, times))[-self.capacity:]
+        self.energy = np.concatenate((self.energy, energy))[-self.capacity:]
+        return len(energy)
+
+
+class LiveFeed:
+    """One source feeding one ``LiveSeries`` and running ``EnergyStats``, safe to refresh from several sessions."""
+
+    def __init__(self, spec: str, capacity: int = DEFAULT_CAPACITY, threshold: float = 60.0):
+        self.source = open_source(spec)
+        self.series = LiveSeries(capacity)
+        self.stats = EnergyStats(threshold=threshold)
+        self.lock = threading.Lock()
+
+    @property
+    def rejected(self) -> int:
+        return self.source.rejected
+
+    def refresh(self) -> tuple:
+        with self.lock:
+            times, energy = self.source.poll()
+            added = self.series.extend(times, energy)
+            self.stats.update(times, energy)
+            return self.series.times, self.series.energy, added
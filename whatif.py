@@ -0,0 +1,107 @@
+"""Incrementally updated what-if day for the interactive cup controls.
+
+Caffeine level is a sum of per-cup responses, ``weight * kernel(t - time)``,
+with the kernel tabulated once per minute offset.  When cups move or change
+dose only the cups whose time or weight changed are subtracted and re-added,
+and energy is re-evaluated from the earliest minute they touch; everything
+before that window is left as it was.
+"""
+
+import time
+from collections import Counter
+
+import numpy as np
+
+from energy_model import (
+    DEFAULT_PARAMS,
+    LN2,
+    ModelParams,
+    baseline_energy,
+    bateman,
+    caffeine_effect,
+    dose_potency,
+    format_clock,
+    minutes_grid,
+    parse_clock,
+)
+from interpolate import threshold_crossings
+
+
+def response_kernel(n: int, params: ModelParams = DEFAULT_PARAMS) -> np.ndarray:
+    """Caffeine (mg) per mg taken, ``n`` minutes from intake onwards (Bateman function)."""
+    ke = LN2 / params.half_life
+    ka = LN2 / params.absorption_half_life
+    return bateman(np.arange(n, dtype=np.float64), ka, ke)
+
+
+class WhatIfDay:
+    def __init__(self, schedule: dict, params: ModelParams = DEFAULT_PARAMS, start: str = "6:00",
+                 end: str = "22:00", threshold: float = 60.0):
+        self.params = params
+        self.threshold = threshold
+        self.minutes = minutes_grid(start, end, 1)
+        self.baseline = baseline_energy(self.minutes, params)
+        self.kernel = response_kernel(len(self.minutes), params)
+        self.level = np.zeros(len(self.minutes))
+        self.energy = np.clip(self.baseline, 0.0, 100.0)
+        self.cups = []  # (minute, dose, weight), weight = dose after acute tolerance
+        self.window = (len(self.minutes), len(self.minutes))
+        self.seconds = 0.0
+        self.update([(parse_clock(clock), dose) for clock, dose in schedule.items()])
+
+    # -----------------------------
+    # Incremental update
+    # -----------------------------
+    def _index(self, minute: float) -> int:
+        return int(np.clip(round(minute - self.minutes[0]), 0, len(self.minutes) - 1))
+
+    def _add(self, minute: float, weight: float, sign: float) -> None:
+        i = self._index(minute)
+        self.level[i:] += sign * weight * self.kernel[:len(self.minutes) - i]
+
+    def update(self, cups) -> tuple:
+        """Move to ``cups`` = ``[(minute, dose), ...]``; returns the recomputed ``(start, end)`` grid slice."""
+        started = time.perf_counter()
+        times = np.array([c[0] for c in cups], dtype=np.float64)
+        doses = np.array([c[1] for c in cups], dtype=np.float64)
+        # A moved cup can change which cups count as later ones, so weights are re-derived for all
+        weights = doses * dose_potency(times, doses, self.params.acute_tolerance) if len(cups) else doses
+        new = [(float(t), float(d), float(w)) for t, d, w in zip(times, doses, weights)]
+
+        # Multiset difference, so two identical cups count twice
+        removed = list((Counter(self.cups) - Counter(new)).elements())
+        added = list((Counter(new) - Counter(self.cups)).elements())
+        for minute, _, weight in removed:
+            self._add(minute, weight, -1.0)
+        for minute, _, weight in added:
+            self._add(minute, weight, +1.0)
+        self.cups = new
+
+        touched = [self._index(minute) for minute, _, _ in removed + added]
+        lo = min(touched, default=len(self.minutes))
+        if lo < len(self.minutes):
+            level = np.maximum(self.level[lo:], 0.0)  # clear float round-off from repeated add/remove
+            self.energy[lo:] = np.clip(self.baseline[lo:] + caffeine_effect(level, self.params), 0.0, 100.0)
+        self.window = (lo, len(self.minutes))
+        self.seconds = time.perf_counter() - started
+        return self.window
+
+    # -----------------------------
+    # Readouts
+    # -----------------------------
+    def stars(self) -> tuple:
+        """``(minutes, energy)`` at each cup."""
+        at = np.array([minute for minute, _, _ in self.cups], dtype=np.float64)
+        return at, np.interp(at, self.minutes, self.energy)
+
+    def metrics(self) -> dict:
+        above = self.energy >= self.threshold
+        times, directions = threshold_crossings(self.minutes, self.energy, self.threshold)
+        return {
+            "peak": int(self.energy.max()),
+            "peak_time": format_clock(self.minutes[int(np.argmax(self.energy))]),
+            "average": round(float(self.energy.mean()), 1),
+            "hours_above": float(above.sum()) / 60,
+            "caffeine_mg": float(sum(dose for _, dose, _ in self.cups)),
+            "crossings": [(format_clock(t), int(d)) for t, d in zip(times, directions)],
+        }